@@ -6,17 +6,27 @@ to provide unified analysis and consistent component identification.
 """
 
 import re
+import sys
 import json
 import logging
 from typing import Dict, List, Any, Optional, Set, Tuple
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 from pathlib import Path
 from strands import tool
 
 logger = logging.getLogger(__name__)
 
+# Module modification time reported as the analysis timestamp
+_MODULE_MTIME = str(Path(__file__).stat().st_mtime)
 
-@dataclass
+# Technical terms that boost component name similarity
+_KEY_TECHNICAL_TERMS = frozenset({'laser', 'detector', 'sensor', 'controller', 'optical', 'temperature', 'pressure'})
+
+# Failure severities that warrant a troubleshooting recommendation
+_ACTIONABLE_SEVERITIES = frozenset({'CRITICAL', 'HIGH'})
+
+
+@dataclass(slots=True)
 class ComponentCorrelation:
     """Represents correlation of a component across different sources"""
     component_name: str
@@ -28,7 +38,7 @@ class ComponentCorrelation:
     consistency_score: float
 
 
-@dataclass
+@dataclass(slots=True)
 class FailurePatternCorrelation:
     """Represents correlation between failure patterns and troubleshooting procedures"""
     failure_pattern: str
@@ -40,7 +50,7 @@ class FailurePatternCorrelation:
     correlation_strength: float
 
 
-@dataclass
+@dataclass(slots=True)
 class UnifiedAnalysis:
     """Unified analysis combining multiple data sources"""
     overall_status: str
@@ -52,6 +62,45 @@ class UnifiedAnalysis:
     analysis_metadata: Dict[str, Any]
 
 
+def _component_correlation_to_dict(correlation: ComponentCorrelation) -> Dict[str, Any]:
+    """Convert a ComponentCorrelation to a dict without asdict() reflection"""
+    return {
+        'component_name': correlation.component_name,
+        'canonical_name': correlation.canonical_name,
+        'source_references': correlation.source_references,
+        'confidence_scores': correlation.confidence_scores,
+        'failure_associations': correlation.failure_associations,
+        'troubleshooting_procedures': correlation.troubleshooting_procedures,
+        'consistency_score': correlation.consistency_score
+    }
+
+
+def _failure_correlation_to_dict(correlation: FailurePatternCorrelation) -> Dict[str, Any]:
+    """Convert a FailurePatternCorrelation to a dict without asdict() reflection"""
+    return {
+        'failure_pattern': correlation.failure_pattern,
+        'pattern_type': correlation.pattern_type,
+        'severity': correlation.severity,
+        'associated_components': correlation.associated_components,
+        'troubleshooting_procedures': correlation.troubleshooting_procedures,
+        'documentation_references': correlation.documentation_references,
+        'correlation_strength': correlation.correlation_strength
+    }
+
+
+def _unified_analysis_to_dict(analysis: UnifiedAnalysis) -> Dict[str, Any]:
+    """Convert a UnifiedAnalysis to a dict without asdict() reflection"""
+    return {
+        'overall_status': analysis.overall_status,
+        'confidence_level': analysis.confidence_level,
+        'component_correlations': [_component_correlation_to_dict(c) for c in analysis.component_correlations],
+        'failure_correlations': [_failure_correlation_to_dict(f) for f in analysis.failure_correlations],
+        'cross_source_consistency': analysis.cross_source_consistency,
+        'unified_recommendations': analysis.unified_recommendations,
+        'analysis_metadata': analysis.analysis_metadata
+    }
+
+
 class CrossSourceCorrelationEngine:
     """Core engine for cross-source correlation and analysis"""
     
@@ -159,8 +208,7 @@ class CrossSourceCorrelationEngine:
         jaccard_similarity = len(intersection) / len(union)
         
         # Boost for key technical terms
-        key_terms = {'laser', 'detector', 'sensor', 'controller', 'optical', 'temperature', 'pressure'}
-        if intersection.intersection(key_terms):
+        if not intersection.isdisjoint(_KEY_TECHNICAL_TERMS):
             jaccard_similarity += 0.1
         
         return min(1.0, jaccard_similarity)
@@ -262,7 +310,7 @@ class CrossSourceCorrelationEngine:
                 else:
                     components.append(match.strip())
         
-        return list(set(components))  # Remove duplicates
+        return list(dict.fromkeys(components))  # Remove duplicates, keep first-seen order
     
     def calculate_cross_source_consistency(self, 
                                          component_correlations: List[ComponentCorrelation]) -> Dict[str, float]:
@@ -277,9 +325,13 @@ class CrossSourceCorrelationEngine:
         high_confidence_components = len([c for c in component_correlations if c.consistency_score > 0.8])
         consistency_metrics['component_identification'] = high_confidence_components / total_components if total_components > 0 else 0.0
         
-        # Source agreement consistency
-        source_agreements = []
+        # Source agreement consistency (running sum instead of a list of ratios)
+        agreement_sum = 0.0
+        agreement_count = 0
+        failure_association_total = 0
         for correlation in component_correlations:
+            failure_association_total += len(correlation.failure_associations)
+            
             if len(correlation.source_references) > 1:
                 # Calculate agreement between sources
                 source_names = list(correlation.source_references.keys())
@@ -298,17 +350,14 @@ class CrossSourceCorrelationEngine:
                             agreements += 1
                 
                 if comparisons > 0:
-                    source_agreements.append(agreements / comparisons)
+                    agreement_sum += agreements / comparisons
+                    agreement_count += 1
         
-        consistency_metrics['source_agreement'] = sum(source_agreements) / len(source_agreements) if source_agreements else 0.0
+        consistency_metrics['source_agreement'] = agreement_sum / agreement_count if agreement_count else 0.0
         
-        # Failure pattern consistency
-        failure_associations = [len(c.failure_associations) for c in component_correlations]
-        if failure_associations:
-            avg_failure_associations = sum(failure_associations) / len(failure_associations)
-            consistency_metrics['failure_pattern_coverage'] = min(1.0, avg_failure_associations / 3.0)  # Normalize to 0-1
-        else:
-            consistency_metrics['failure_pattern_coverage'] = 0.0
+        # Failure pattern consistency (component_correlations is non-empty here)
+        avg_failure_associations = failure_association_total / total_components
+        consistency_metrics['failure_pattern_coverage'] = min(1.0, avg_failure_associations / 3.0)  # Normalize to 0-1
         
         return consistency_metrics
     
@@ -381,7 +430,7 @@ def correlate_components_across_sources(
                     issue.get('description', '') + ' ' + ' '.join(issue.get('sample_matches', []))
                 )
                 log_components.extend(components)
-            source_components['log_analysis'] = list(set(log_components))
+            source_components['log_analysis'] = list(dict.fromkeys(log_components))
         
         # From component inventory
         if component_inventory and 'inventory' in component_inventory:
@@ -405,12 +454,12 @@ def correlate_components_across_sources(
                         components = _correlation_engine._extract_components_from_text(text_content)
                         doc_components.extend(components)
             
-            source_components['document_analysis'] = list(set(doc_components))
+            source_components['document_analysis'] = list(dict.fromkeys(doc_components))
         
-        # Find all unique components across sources
-        all_components = set()
+        # Find all unique components across sources (dict keeps source order)
+        all_components = {}
         for components in source_components.values():
-            all_components.update(components)
+            all_components.update(dict.fromkeys(components))
         
         # Correlate each component across sources
         component_correlations = []
@@ -476,7 +525,7 @@ def correlate_components_across_sources(
         }
         
         result = {
-            'component_correlations': [asdict(corr) for corr in component_correlations],
+            'component_correlations': [_component_correlation_to_dict(corr) for corr in component_correlations],
             'consistency_metrics': consistency_metrics,
             'correlation_summary': correlation_summary,
             'source_components': source_components,
@@ -620,9 +669,9 @@ def correlate_failures_to_procedures(
                     })
         
         result = {
-            'failure_correlations': [asdict(corr) for corr in filtered_correlations],
+            'failure_correlations': [_failure_correlation_to_dict(corr) for corr in filtered_correlations],
             'correlation_statistics': correlation_stats,
-            'correlations_by_severity': {k: [asdict(c) for c in v] for k, v in correlations_by_severity.items()},
+            'correlations_by_severity': {k: [_failure_correlation_to_dict(c) for c in v] for k, v in correlations_by_severity.items()},
             'procedure_recommendations': procedure_recommendations,
             'correlation_metadata': {
                 'correlation_threshold': correlation_strength_threshold,
@@ -647,7 +696,8 @@ def generate_unified_analysis(
     log_analysis_data: Dict[str, Any],
     component_correlations: Dict[str, Any],
     failure_correlations: Dict[str, Any],
-    diagnosis_data: Optional[Dict[str, Any]] = None
+    diagnosis_data: Optional[Dict[str, Any]] = None,
+    include: Optional[List[str]] = None
 ) -> Dict[str, Any]:
     """
     Generate unified analysis combining multiple data sources.
@@ -657,6 +707,9 @@ def generate_unified_analysis(
         component_correlations: Results from correlate_components_across_sources
         failure_correlations: Results from correlate_failures_to_procedures
         diagnosis_data: Optional diagnosis results for additional context
+        include: Optional result sections to build in addition to 'unified_analysis'
+                 ('executive_summary', 'actionable_insights', 'data_quality_assessment').
+                 All sections are built when omitted.
     
     Returns:
         Dictionary containing unified analysis and recommendations
@@ -703,7 +756,14 @@ def generate_unified_analysis(
         failure_corr_list = []
         if 'failure_correlations' in failure_correlations:
             for corr_data in failure_correlations['failure_correlations']:
-                failure_corr_list.append(FailurePatternCorrelation(**corr_data))
+                failure_corr = FailurePatternCorrelation(**corr_data)
+                # Tool inputs arrive JSON-decoded (not interned); intern the
+                # severity so the repeated comparisons below hit identity first.
+                # It is LLM-supplied and may be null or a number, which is only
+                # ever compared, never interned
+                if isinstance(failure_corr.severity, str):
+                    failure_corr.severity = sys.intern(failure_corr.severity)
+                failure_corr_list.append(failure_corr)
         
         # Calculate cross-source consistency
         cross_source_consistency = {}
@@ -738,7 +798,7 @@ def generate_unified_analysis(
             'total_failure_patterns': len(failure_corr_list),
             'confidence_level': 'HIGH' if unified_confidence > 0.8 else 'MEDIUM' if unified_confidence > 0.6 else 'LOW',
             'consistency_level': 'HIGH' if cross_source_consistency['overall_consistency'] > 0.8 else 'MEDIUM' if cross_source_consistency['overall_consistency'] > 0.6 else 'LOW',
-            'analysis_timestamp': str(Path(__file__).stat().st_mtime),
+            'analysis_timestamp': _MODULE_MTIME,
             'diagnosis_included': diagnosis_data is not None
         }
         
@@ -753,13 +813,18 @@ def generate_unified_analysis(
             analysis_metadata=analysis_metadata
         )
         
-        result = {
-            'unified_analysis': asdict(unified_analysis),
-            'executive_summary': _generate_executive_summary(unified_analysis),
-            'actionable_insights': _extract_actionable_insights(unified_analysis),
-            'data_quality_assessment': _assess_data_quality(log_analysis_data, component_correlations, failure_correlations)
+        # Optional sections are only computed when requested
+        section_builders = {
+            'executive_summary': lambda: _generate_executive_summary(unified_analysis),
+            'actionable_insights': lambda: _extract_actionable_insights(unified_analysis),
+            'data_quality_assessment': lambda: _assess_data_quality(log_analysis_data, component_correlations, failure_correlations)
         }
         
+        result = {'unified_analysis': _unified_analysis_to_dict(unified_analysis)}
+        for section, build_section in section_builders.items():
+            if include is None or section in include:
+                result[section] = build_section()
+        
         return result
         
     except Exception as e:
@@ -788,27 +853,35 @@ def _determine_unified_status(log_analysis_data: Dict[str, Any],
     return 'UNCERTAIN'
 
 
+# Status-based recommendation template for every FAIL analysis; results carry copies
+_STOP_OPERATION_RECOMMENDATION = {
+    'priority': 'IMMEDIATE',
+    'category': 'SAFETY',
+    'action': 'Stop instrument operation immediately',
+    'description': 'Critical issues detected across multiple data sources',
+    'source': 'unified_analysis'
+}
+
+
 def _generate_unified_recommendations(overall_status: str,
                                     component_correlations: List[ComponentCorrelation],
                                     failure_correlations: List[FailurePatternCorrelation],
                                     log_analysis_data: Dict[str, Any]) -> List[Dict[str, Any]]:
     """Generate unified recommendations from all sources"""
-    recommendations = []
+    # Only IMMEDIATE, HIGH and MEDIUM priorities are produced, so appending to
+    # per-priority buckets yields priority order without sorting
+    immediate = []
+    high = []
+    medium = []
     
     # Status-based recommendations
     if overall_status == 'FAIL':
-        recommendations.append({
-            'priority': 'IMMEDIATE',
-            'category': 'SAFETY',
-            'action': 'Stop instrument operation immediately',
-            'description': 'Critical issues detected across multiple data sources',
-            'source': 'unified_analysis'
-        })
+        immediate.append(dict(_STOP_OPERATION_RECOMMENDATION))
     
     # Component-specific recommendations
     for component_corr in component_correlations:
         if component_corr.failure_associations:
-            recommendations.append({
+            high.append({
                 'priority': 'HIGH',
                 'category': 'COMPONENT',
                 'action': f'Investigate {component_corr.canonical_name}',
@@ -819,10 +892,11 @@ def _generate_unified_recommendations(overall_status: str,
     
     # Failure pattern recommendations
     for failure_corr in failure_correlations:
-        if failure_corr.severity in ['CRITICAL', 'HIGH'] and failure_corr.troubleshooting_procedures:
+        if failure_corr.severity in _ACTIONABLE_SEVERITIES and failure_corr.troubleshooting_procedures:
             procedure = failure_corr.troubleshooting_procedures[0]  # First/best procedure
-            recommendations.append({
-                'priority': 'HIGH' if failure_corr.severity == 'CRITICAL' else 'MEDIUM',
+            is_critical = failure_corr.severity == 'CRITICAL'
+            (high if is_critical else medium).append({
+                'priority': 'HIGH' if is_critical else 'MEDIUM',
                 'category': 'TROUBLESHOOTING',
                 'action': f'Execute procedure: {procedure.get("title", "Unnamed")}',
                 'description': f'Address {failure_corr.failure_pattern}',
@@ -830,9 +904,7 @@ def _generate_unified_recommendations(overall_status: str,
                 'procedure': procedure
             })
     
-    # Sort by priority
-    priority_order = {'IMMEDIATE': 0, 'HIGH': 1, 'MEDIUM': 2, 'LOW': 3}
-    recommendations.sort(key=lambda x: priority_order.get(x['priority'], 4))
+    recommendations = immediate + high + medium
     
     return recommendations[:10]  # Limit to top 10
 
@@ -855,52 +927,68 @@ def _generate_executive_summary(unified_analysis: UnifiedAnalysis) -> Dict[str,
 
 def _extract_actionable_insights(unified_analysis: UnifiedAnalysis) -> List[Dict[str, Any]]:
     """Extract key actionable insights from unified analysis"""
-    insights = []
+    # At most one insight each for components, failures and consistency
+    insights = [None] * 3
+    count = 0
     
     # Component insights
     high_risk_components = [c for c in unified_analysis.component_correlations 
                            if len(c.failure_associations) > 2]
     if high_risk_components:
-        insights.append({
+        insights[count] = {
             'type': 'component_risk',
             'insight': f"{len(high_risk_components)} components have multiple failure associations",
             'action': 'Prioritize inspection of high-risk components',
             'components': [c.canonical_name for c in high_risk_components]
-        })
+        }
+        count += 1
     
     # Failure pattern insights
     critical_failures = [f for f in unified_analysis.failure_correlations if f.severity == 'CRITICAL']
     if critical_failures:
-        insights.append({
+        insights[count] = {
             'type': 'critical_failures',
             'insight': f"{len(critical_failures)} critical failure patterns detected",
             'action': 'Address critical failures immediately',
             'patterns': [f.failure_pattern for f in critical_failures]
-        })
+        }
+        count += 1
     
     # Consistency insights
     if unified_analysis.cross_source_consistency['overall_consistency'] < 0.6:
-        insights.append({
+        insights[count] = {
             'type': 'data_consistency',
             'insight': 'Low consistency between data sources detected',
             'action': 'Verify data quality and consider additional diagnostics',
             'consistency_score': unified_analysis.cross_source_consistency['overall_consistency']
-        })
+        }
+        count += 1
+    del insights[count:]
     
     return insights
 
 
+# Quality label for each per-source quality score
+_QUALITY_LABELS = {1.0: 'HIGH', 0.6: 'MEDIUM', 0.3: 'LOW'}
+
+
 def _assess_data_quality(log_analysis_data: Dict[str, Any],
                         component_correlations: Dict[str, Any],
                         failure_correlations: Dict[str, Any]) -> Dict[str, Any]:
     """Assess quality of input data sources"""
     quality_assessment = {}
+    # Running total of per-source scores (HIGH=1.0, MEDIUM=0.6, LOW=0.3)
+    scores_sum = 0.0
+    scores_count = 0
     
     # Log analysis quality
     if 'analysis_summary' in log_analysis_data:
         total_patterns = log_analysis_data['analysis_summary'].get('total_patterns', 0)
+        score = 1.0 if total_patterns > 5 else 0.6 if total_patterns > 0 else 0.3
+        scores_sum += score
+        scores_count += 1
         quality_assessment['log_analysis'] = {
-            'quality': 'HIGH' if total_patterns > 5 else 'MEDIUM' if total_patterns > 0 else 'LOW',
+            'quality': _QUALITY_LABELS[score],
             'patterns_detected': total_patterns,
             'completeness': 'COMPLETE' if 'chunk_details' in log_analysis_data else 'PARTIAL'
         }
@@ -908,8 +996,11 @@ def _assess_data_quality(log_analysis_data: Dict[str, Any],
     # Component correlation quality
     if 'correlation_summary' in component_correlations:
         corr_rate = component_correlations['correlation_summary'].get('correlation_rate', 0.0)
+        score = 1.0 if corr_rate > 0.8 else 0.6 if corr_rate > 0.5 else 0.3
+        scores_sum += score
+        scores_count += 1
         quality_assessment['component_correlations'] = {
-            'quality': 'HIGH' if corr_rate > 0.8 else 'MEDIUM' if corr_rate > 0.5 else 'LOW',
+            'quality': _QUALITY_LABELS[score],
             'correlation_rate': corr_rate,
             'sources_analyzed': len(component_correlations['correlation_summary'].get('sources_analyzed', []))
         }
@@ -917,23 +1008,17 @@ def _assess_data_quality(log_analysis_data: Dict[str, Any],
     # Failure correlation quality
     if 'correlation_statistics' in failure_correlations:
         fail_corr_rate = failure_correlations['correlation_statistics'].get('correlation_rate', 0.0)
+        score = 1.0 if fail_corr_rate > 0.7 else 0.6 if fail_corr_rate > 0.4 else 0.3
+        scores_sum += score
+        scores_count += 1
         quality_assessment['failure_correlations'] = {
-            'quality': 'HIGH' if fail_corr_rate > 0.7 else 'MEDIUM' if fail_corr_rate > 0.4 else 'LOW',
+            'quality': _QUALITY_LABELS[score],
             'correlation_rate': fail_corr_rate,
             'procedures_matched': failure_correlations['correlation_statistics'].get('correlations_found', 0)
         }
     
     # Overall quality
-    quality_scores = []
-    for assessment in quality_assessment.values():
-        if assessment['quality'] == 'HIGH':
-            quality_scores.append(1.0)
-        elif assessment['quality'] == 'MEDIUM':
-            quality_scores.append(0.6)
-        else:
-            quality_scores.append(0.3)
-    
-    overall_quality = sum(quality_scores) / len(quality_scores) if quality_scores else 0.0
+    overall_quality = scores_sum / scores_count if scores_count else 0.0
     quality_assessment['overall'] = {
         'quality': 'HIGH' if overall_quality > 0.8 else 'MEDIUM' if overall_quality > 0.5 else 'LOW',
         'score': overall_quality,
@@ -5,19 +5,205 @@ These tools generate comprehensive diagnoses based on S3 log analysis results,
 with confidence scoring and recommendation generation.
 """
 
+import sys
+import time
 import json
-from typing import Dict, List, Any, Optional
-from dataclasses import dataclass, asdict
-from datetime import datetime
+import functools
+import threading
+from typing import Dict, List, Any, Mapping, Optional, Tuple
+from dataclasses import dataclass
 import logging
+from io import BytesIO
+from itertools import islice
+from operator import itemgetter
+from types import MappingProxyType
+from boto3.s3.transfer import TransferConfig
 from strands import tool
 from .s3_storage_tools import get_storage_manager
 from .s3_log_analysis_tools import get_s3_analyzer
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+# Shared read-only fallback for missing analysis sub-dicts
+_EMPTY_MAPPING = MappingProxyType({})
+
+# Diagnoses at or above this size are uploaded as concurrent multipart parts
+_MULTIPART_THRESHOLD = 5 * 1024 * 1024
+
+# Stored diagnosis layout marker and the byte budget for reading its index header
+_SECTIONED_FORMAT = 'diagnosis-ndjson-v1'
+_SECTION_HEADER_READ_BYTES = 4096
+
+
+@functools.lru_cache(maxsize=256)
+def _parse_s3_uri(s3_uri: str) -> Optional[Tuple[str, str]]:
+    """Split an s3://bucket/key URI into (bucket, key), or None if malformed"""
+    if not s3_uri.startswith('s3://'):
+        return None
+    parts = s3_uri[5:].split('/', 1)
+    return (parts[0], parts[1]) if len(parts) == 2 else None
+
+
+def _dumps_json(data: Any) -> bytes:
+    """Serialize data to single-line UTF-8 JSON bytes, using orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data).encode('utf-8')
+
+
+def _loads_json(content: bytes) -> Any:
+    """Parse JSON bytes, using orjson when available"""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def _encode_sectioned_diagnosis(diagnosis_data: Dict[str, Any]) -> bytes:
+    """
+    Encode a diagnosis as NDJSON: an index header line followed by one JSON line per field.
+    
+    The header maps each field name to its [start, end) byte range, relative to
+    the first byte after the header line, so single fields can be range-read.
+    """
+    section_lines = []
+    section_index = {}
+    offset = 0
+    for name, value in diagnosis_data.items():
+        line = _dumps_json(value) + b'\n'
+        section_index[name] = [offset, offset + len(line)]
+        offset += len(line)
+        section_lines.append(line)
+    
+    header = _dumps_json({'format': _SECTIONED_FORMAT, 'sections': section_index}) + b'\n'
+    return header + b''.join(section_lines)
+
+
+def _parse_section_index(header_line: bytes) -> Optional[Dict[str, List[int]]]:
+    """Return the section index from a sectioned diagnosis header line, or None"""
+    try:
+        header = _loads_json(header_line)
+    except ValueError:
+        return None
+    if isinstance(header, dict) and header.get('format') == _SECTIONED_FORMAT:
+        return header['sections']
+    return None
+
+
+def _decode_sectioned_diagnosis(content: bytes) -> Dict[str, Any]:
+    """Decode a stored diagnosis, accepting both sectioned and single-document JSON"""
+    header_line, _, body = content.partition(b'\n')
+    section_index = _parse_section_index(header_line)
+    if section_index is None:
+        # Diagnosis stored as a single JSON document
+        return _loads_json(content)
+    return {
+        name: _loads_json(body[start:end])
+        for name, (start, end) in section_index.items()
+    }
+
+
+def _read_diagnosis_section(s3_client: Any, bucket: str, s3_key: str, section: str) -> Optional[Dict[str, Any]]:
+    """
+    Read a single diagnosis field with ranged GETs (header first, then the section).
+    
+    Returns:
+        {section: value}, or None if the diagnosis has no such section
+    """
+    head = s3_client.get_object(
+        Bucket=bucket, Key=s3_key, Range=f'bytes=0-{_SECTION_HEADER_READ_BYTES - 1}'
+    )['Body'].read()
+    header_line, newline, _ = head.partition(b'\n')
+    section_index = _parse_section_index(header_line) if newline else None
+    
+    if section_index is None:
+        # Single-document diagnosis or oversized header: fall back to a full read
+        content = s3_client.get_object(Bucket=bucket, Key=s3_key)['Body'].read()
+        diagnosis_data = _decode_sectioned_diagnosis(content)
+        return {section: diagnosis_data[section]} if section in diagnosis_data else None
+    
+    if section not in section_index:
+        return None
+    
+    body_offset = len(header_line) + 1
+    start, end = section_index[section]
+    content = s3_client.get_object(
+        Bucket=bucket, Key=s3_key, Range=f'bytes={body_offset + start}-{body_offset + end - 1}'
+    )['Body'].read()
+    return {section: _loads_json(content)}
+
+
+# Root cause sort rank by severity (unknown severities sort last)
+_SEVERITY_SORT_RANK = {'CRITICAL': 0, 'WARNING': 1, 'INFO': 2}
+
+# Static recommendation templates, shared by every diagnosis; results carry copies
+_CRITICAL_RECOMMENDATION = {
+    'priority': 'URGENT',
+    'action': 'Immediate Investigation Required',
+    'description': 'Critical system failures detected. Stop operations and investigate immediately.',
+    'estimated_time': 'Immediate'
+}
+
+_CATEGORY_RECOMMENDATIONS = {
+    'connection_timeout': {
+        'priority': 'HIGH',
+        'action': 'Check Network and USB Connections',
+        'description': 'Verify all physical connections, network cables, and USB ports. Test connectivity.',
+        'estimated_time': '15-30 minutes'
+    },
+    'memory_issues': {
+        'priority': 'HIGH',
+        'action': 'Monitor System Resources',
+        'description': 'Check available memory, close unnecessary applications, consider system restart.',
+        'estimated_time': '10-20 minutes'
+    },
+    'disk_issues': {
+        'priority': 'MEDIUM',
+        'action': 'Check Disk Space',
+        'description': 'Verify available disk space, clean up temporary files, check disk health.',
+        'estimated_time': '20-30 minutes'
+    },
+    'service_failures': {
+        'priority': 'HIGH',
+        'action': 'Restart Services',
+        'description': 'Restart affected services or perform system reboot. Check service logs.',
+        'estimated_time': '10-15 minutes'
+    },
+    'performance_degradation': {
+        'priority': 'MEDIUM',
+        'action': 'Performance Optimization',
+        'description': 'Monitor system performance, check for resource-intensive processes, optimize settings.',
+        'estimated_time': '30-60 minutes'
+    },
+    'driver_issues': {
+        'priority': 'MEDIUM',
+        'action': 'Update Drivers',
+        'description': 'Check for driver updates, verify driver compatibility, reinstall if necessary.',
+        'estimated_time': '30-45 minutes'
+    }
+}
+
+_STATUS_RECOMMENDATIONS = {
+    'PASS': {
+        'priority': 'LOW',
+        'action': 'Continue Monitoring',
+        'description': 'System appears healthy. Continue normal operations with routine monitoring.',
+        'estimated_time': 'Ongoing'
+    },
+    'UNCERTAIN': {
+        'priority': 'MEDIUM',
+        'action': 'Enhanced Monitoring',
+        'description': 'Some issues detected. Increase monitoring frequency and watch for pattern changes.',
+        'estimated_time': 'Ongoing'
+    }
+}
+
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class DiagnosisResult:
     """Comprehensive diagnosis result"""
     diagnosis_id: str
@@ -31,17 +217,29 @@ class DiagnosisResult:
     recommendations: List[Dict[str, Any]]
     supporting_evidence: Dict[str, Any]
     s3_references: List[str]
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Build a shallow dict of the fields; nested values are already JSON-safe"""
+        return {
+            'diagnosis_id': self.diagnosis_id,
+            'timestamp': self.timestamp,
+            'status': self.status,
+            'confidence': self.confidence,
+            'severity': self.severity,
+            'summary': self.summary,
+            'failure_indicators': self.failure_indicators,
+            'root_causes': self.root_causes,
+            'recommendations': self.recommendations,
+            'supporting_evidence': self.supporting_evidence,
+            's3_references': self.s3_references
+        }
 
 
 class DiagnosisGenerator:
     """Generates comprehensive diagnoses from log analysis results"""
     
-    def __init__(self):
-        self.confidence_thresholds = {
-            'high': 0.85,
-            'medium': 0.70,
-            'low': 0.50
-        }
+    # Stateless: all lookup tables are module-level constants
+    __slots__ = ()
     
     def generate_diagnosis(
         self,
@@ -60,21 +258,29 @@ class DiagnosisGenerator:
         Returns:
             DiagnosisResult object
         """
-        # Generate unique diagnosis ID
-        diagnosis_id = f"DIAG-{session_id}-{datetime.utcnow().strftime('%Y%m%d%H%M%S')}"
+        # Generate unique diagnosis ID (and timestamp) from a single clock read
+        now = time.gmtime()
+        diagnosis_id = f"DIAG-{session_id}-{time.strftime('%Y%m%d%H%M%S', now)}"
         
         # Extract key information from analysis
         status = analysis_results.get('status', 'UNCERTAIN')
         confidence = analysis_results.get('confidence', 0.5)
         
+        # Look up the pattern and summary sections once for all helpers
+        patterns = analysis_results.get('patterns') or _EMPTY_MAPPING
+        log_summary = analysis_results.get('summary') or _EMPTY_MAPPING
+        
         # Determine severity
-        severity = self._determine_severity(analysis_results)
+        severity = self._determine_severity(patterns, log_summary)
+        
+        # Walk the pattern details once for both indicators and root causes
+        critical_descriptions, pattern_groups = self._summarize_patterns(patterns)
         
         # Extract failure indicators
-        failure_indicators = self._extract_failure_indicators(analysis_results)
+        failure_indicators = self._extract_failure_indicators(critical_descriptions, log_summary)
         
         # Identify root causes
-        root_causes = self._identify_root_causes(analysis_results)
+        root_causes = self._identify_root_causes(pattern_groups)
         
         # Generate recommendations
         recommendations = self._generate_recommendations(
@@ -87,14 +293,14 @@ class DiagnosisGenerator:
         )
         
         # Collect supporting evidence
-        supporting_evidence = self._collect_evidence(analysis_results)
+        supporting_evidence = self._collect_evidence(patterns, log_summary)
         
         # Extract S3 references
-        s3_references = self._extract_s3_references(analysis_results)
+        s3_references = self._extract_s3_references(analysis_results, log_summary)
         
         diagnosis = DiagnosisResult(
             diagnosis_id=diagnosis_id,
-            timestamp=datetime.utcnow().isoformat(),
+            timestamp=time.strftime('%Y-%m-%dT%H:%M:%S', now),
             status=status,
             confidence=confidence,
             severity=severity,
@@ -108,85 +314,88 @@ class DiagnosisGenerator:
         
         return diagnosis
     
-    def _determine_severity(self, analysis_results: Dict[str, Any]) -> str:
-        """Determine severity level from analysis results"""
-        patterns = analysis_results.get('patterns', {})
-        summary = analysis_results.get('summary', {})
-        
+    def _determine_severity(self, patterns: Mapping[str, Any], summary: Mapping[str, Any]) -> str:
+        """Determine severity level from the analysis pattern and summary sections"""
         critical_patterns = patterns.get('critical', 0)
+        warning_patterns = patterns.get('warnings', 0)
         error_count = summary.get('error_count', 0)
-        critical_events = len(summary.get('critical_events', []))
+        critical_events = len(summary.get('critical_events') or ())
         
         if critical_patterns > 0 or critical_events > 0:
             return 'CRITICAL'
         elif error_count > 50:
             return 'HIGH'
-        elif error_count > 20 or patterns.get('warnings', 0) > 50:
+        elif error_count > 20 or warning_patterns > 50:
             return 'MEDIUM'
-        elif error_count > 0 or patterns.get('warnings', 0) > 0:
+        elif error_count > 0 or warning_patterns > 0:
             return 'LOW'
         else:
             return 'NONE'
     
-    def _extract_failure_indicators(self, analysis_results: Dict[str, Any]) -> List[str]:
-        """Extract failure indicators from analysis results"""
-        indicators = []
-        
-        # From patterns
-        patterns = analysis_results.get('patterns', {})
-        pattern_details = patterns.get('details', [])
+    def _summarize_patterns(self, patterns: Mapping[str, Any]) -> Tuple[List[str], Dict[str, list]]:
+        """Collect critical descriptions and per-type groups from pattern details in one pass"""
+        pattern_details = patterns.get('details') or ()
         
+        critical_descriptions = []
+        # type -> [confidence_sum, occurrence_count, first_pattern, evidence]
+        pattern_groups = {}
         for pattern in pattern_details:
             if pattern.get('severity') == 'CRITICAL':
-                indicators.append(pattern.get('description', 'Unknown critical issue'))
+                critical_descriptions.append(pattern.get('description', 'Unknown critical issue'))
+            
+            ptype = pattern.get('type', 'unknown')
+            group = pattern_groups.get(ptype)
+            if group is None:
+                # Intern the category once per group so later lookups in the
+                # (already interned) recommendation table match by identity
+                ptype = sys.intern(ptype)
+                # First 2 lines from first 3 patterns
+                pattern_groups[ptype] = [
+                    pattern.get('confidence', 0), 1, pattern,
+                    [pattern.get('sample_lines', [])[:2]]
+                ]
+            else:
+                group[0] += pattern.get('confidence', 0)
+                group[1] += 1
+                if len(group[3]) < 3:
+                    group[3].append(pattern.get('sample_lines', [])[:2])
+        
+        return critical_descriptions, pattern_groups
+    
+    def _extract_failure_indicators(self, critical_descriptions: List[str], summary: Mapping[str, Any]) -> List[str]:
+        """Extract failure indicators from critical pattern descriptions and the summary section"""
+        # From patterns
+        indicators = list(critical_descriptions)
         
         # From summary
-        summary = analysis_results.get('summary', {})
-        critical_events = summary.get('critical_events', [])
+        critical_events = summary.get('critical_events') or ()
         
-        for event in critical_events[:5]:  # Limit to 5
+        for event in islice(critical_events, 5):  # Limit to 5
             indicators.append(f"Critical event: {event}")
         
         return indicators
     
-    def _identify_root_causes(self, analysis_results: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Identify potential root causes from analysis results"""
-        root_causes = []
-        
-        patterns = analysis_results.get('patterns', {})
-        pattern_details = patterns.get('details', [])
-        
-        # Group patterns by type to identify root causes
-        pattern_types = {}
-        for pattern in pattern_details:
-            ptype = pattern.get('type', 'unknown')
-            if ptype not in pattern_types:
-                pattern_types[ptype] = []
-            pattern_types[ptype].append(pattern)
-        
-        # Analyze pattern groups
-        for ptype, plist in pattern_types.items():
-            if len(plist) > 0:
-                # Calculate aggregate confidence
-                avg_confidence = sum(p.get('confidence', 0) for p in plist) / len(plist)
-                
-                root_cause = {
-                    'category': ptype,
-                    'description': plist[0].get('description', 'Unknown issue'),
-                    'confidence': round(avg_confidence, 2),
-                    'occurrence_count': len(plist),
-                    'severity': plist[0].get('severity', 'UNKNOWN'),
-                    'evidence': [p.get('sample_lines', [])[:2] for p in plist[:3]]  # First 2 lines from first 3 patterns
-                }
-                root_causes.append(root_cause)
+    def _identify_root_causes(self, pattern_groups: Dict[str, list]) -> List[Dict[str, Any]]:
+        """Identify potential root causes from patterns grouped by type"""
+        # Build root causes along with their severity/confidence sort key
+        ranked_causes = []
+        for ptype, (confidence_sum, count, first_pattern, evidence) in pattern_groups.items():
+            severity = first_pattern.get('severity', 'UNKNOWN')
+            confidence = round(confidence_sum / count, 2)
+            root_cause = {
+                'category': ptype,
+                'description': first_pattern.get('description', 'Unknown issue'),
+                'confidence': confidence,
+                'occurrence_count': count,
+                'severity': severity,
+                'evidence': evidence
+            }
+            ranked_causes.append(((_SEVERITY_SORT_RANK.get(severity, 3), -confidence), root_cause))
         
         # Sort by severity and confidence
-        severity_order = {'CRITICAL': 0, 'WARNING': 1, 'INFO': 2}
-        root_causes.sort(
-            key=lambda x: (severity_order.get(x['severity'], 3), -x['confidence'])
-        )
+        ranked_causes.sort(key=itemgetter(0))
         
-        return root_causes[:10]  # Limit to top 10
+        return [root_cause for _, root_cause in islice(ranked_causes, 10)]  # Limit to top 10
     
     def _generate_recommendations(
         self,
@@ -196,90 +405,36 @@ class DiagnosisGenerator:
         analysis_results: Dict[str, Any]
     ) -> List[Dict[str, Any]]:
         """Generate actionable recommendations"""
-        recommendations = []
+        # At most one severity, five root-cause and one status recommendation
+        recommendations = [None] * 7
+        count = 0
         
         # Priority recommendations based on severity
         if severity == 'CRITICAL':
-            recommendations.append({
-                'priority': 'URGENT',
-                'action': 'Immediate Investigation Required',
-                'description': 'Critical system failures detected. Stop operations and investigate immediately.',
-                'estimated_time': 'Immediate'
-            })
-        
-        # Recommendations based on root causes
-        for cause in root_causes[:5]:  # Top 5 causes
-            category = cause['category']
-            
-            if category == 'connection_timeout':
-                recommendations.append({
-                    'priority': 'HIGH',
-                    'action': 'Check Network and USB Connections',
-                    'description': 'Verify all physical connections, network cables, and USB ports. Test connectivity.',
-                    'estimated_time': '15-30 minutes'
-                })
-            elif category == 'memory_issues':
-                recommendations.append({
-                    'priority': 'HIGH',
-                    'action': 'Monitor System Resources',
-                    'description': 'Check available memory, close unnecessary applications, consider system restart.',
-                    'estimated_time': '10-20 minutes'
-                })
-            elif category == 'disk_issues':
-                recommendations.append({
-                    'priority': 'MEDIUM',
-                    'action': 'Check Disk Space',
-                    'description': 'Verify available disk space, clean up temporary files, check disk health.',
-                    'estimated_time': '20-30 minutes'
-                })
-            elif category == 'service_failures':
-                recommendations.append({
-                    'priority': 'HIGH',
-                    'action': 'Restart Services',
-                    'description': 'Restart affected services or perform system reboot. Check service logs.',
-                    'estimated_time': '10-15 minutes'
-                })
-            elif category == 'performance_degradation':
-                recommendations.append({
-                    'priority': 'MEDIUM',
-                    'action': 'Performance Optimization',
-                    'description': 'Monitor system performance, check for resource-intensive processes, optimize settings.',
-                    'estimated_time': '30-60 minutes'
-                })
-            elif category == 'driver_issues':
-                recommendations.append({
-                    'priority': 'MEDIUM',
-                    'action': 'Update Drivers',
-                    'description': 'Check for driver updates, verify driver compatibility, reinstall if necessary.',
-                    'estimated_time': '30-45 minutes'
-                })
+            recommendations[count] = _CRITICAL_RECOMMENDATION
+            count += 1
+        
+        # Recommendations based on root causes (category lookup bound once)
+        recommendation_for_category = _CATEGORY_RECOMMENDATIONS.get
+        for cause in islice(root_causes, 5):  # Top 5 causes
+            category_recommendation = recommendation_for_category(cause['category'])
+            if category_recommendation:
+                recommendations[count] = category_recommendation
+                count += 1
         
         # General recommendations based on status
-        if status == 'PASS':
-            recommendations.append({
-                'priority': 'LOW',
-                'action': 'Continue Monitoring',
-                'description': 'System appears healthy. Continue normal operations with routine monitoring.',
-                'estimated_time': 'Ongoing'
-            })
-        elif status == 'UNCERTAIN':
-            recommendations.append({
-                'priority': 'MEDIUM',
-                'action': 'Enhanced Monitoring',
-                'description': 'Some issues detected. Increase monitoring frequency and watch for pattern changes.',
-                'estimated_time': 'Ongoing'
-            })
-        
-        # Remove duplicates and limit
-        seen = set()
-        unique_recommendations = []
-        for rec in recommendations:
-            key = rec['action']
-            if key not in seen:
-                seen.add(key)
-                unique_recommendations.append(rec)
-        
-        return unique_recommendations[:8]  # Limit to 8 recommendations
+        status_recommendation = _STATUS_RECOMMENDATIONS.get(status)
+        if status_recommendation:
+            recommendations[count] = status_recommendation
+            count += 1
+        del recommendations[count:]
+        
+        # Remove duplicates (keyed by action, first-seen order) and limit
+        unique_recommendations = {rec['action']: rec for rec in recommendations}
+        
+        # Hand out copies so callers that annotate a recommendation never
+        # change the shared templates seen by later diagnoses
+        return [dict(rec) for rec in islice(unique_recommendations.values(), 8)]  # Limit to 8 recommendations
     
     def _create_summary(
         self,
@@ -289,32 +444,37 @@ class DiagnosisGenerator:
         root_causes: List[Dict[str, Any]]
     ) -> str:
         """Create human-readable summary"""
-        summary_parts = []
+        # Status and severity are always present; indicators and causes are optional
+        summary_parts = [None] * 4
+        count = 2
         
         # Status summary
         if status == 'FAIL':
-            summary_parts.append("DIAGNOSIS: System failure detected.")
+            summary_parts[0] = "DIAGNOSIS: System failure detected."
         elif status == 'UNCERTAIN':
-            summary_parts.append("DIAGNOSIS: Potential issues detected requiring investigation.")
+            summary_parts[0] = "DIAGNOSIS: Potential issues detected requiring investigation."
         else:
-            summary_parts.append("DIAGNOSIS: System appears to be operating normally.")
+            summary_parts[0] = "DIAGNOSIS: System appears to be operating normally."
         
         # Severity
-        summary_parts.append(f"Severity: {severity}.")
+        summary_parts[1] = f"Severity: {severity}."
         
         # Failure indicators
         if failure_indicators:
-            summary_parts.append(f"Detected {len(failure_indicators)} failure indicator(s).")
+            summary_parts[count] = f"Detected {len(failure_indicators)} failure indicator(s)."
+            count += 1
         
         # Root causes
         if root_causes:
-            top_causes = [rc['category'].replace('_', ' ').title() for rc in root_causes[:3]]
-            summary_parts.append(f"Primary concerns: {', '.join(top_causes)}.")
+            top_causes = [rc['category'].replace('_', ' ').title() for rc in islice(root_causes, 3)]
+            summary_parts[count] = f"Primary concerns: {', '.join(top_causes)}."
+            count += 1
+        del summary_parts[count:]
         
         return " ".join(summary_parts)
     
-    def _collect_evidence(self, analysis_results: Dict[str, Any]) -> Dict[str, Any]:
-        """Collect supporting evidence from analysis"""
+    def _collect_evidence(self, patterns: Mapping[str, Any], summary: Mapping[str, Any]) -> Dict[str, Any]:
+        """Collect supporting evidence from the analysis pattern and summary sections"""
         evidence = {
             'log_statistics': {},
             'pattern_summary': {},
@@ -322,7 +482,6 @@ class DiagnosisGenerator:
         }
         
         # Log statistics
-        summary = analysis_results.get('summary', {})
         evidence['log_statistics'] = {
             'total_lines': summary.get('total_lines', 0),
             'error_count': summary.get('error_count', 0),
@@ -331,7 +490,6 @@ class DiagnosisGenerator:
         }
         
         # Pattern summary
-        patterns = analysis_results.get('patterns', {})
         evidence['pattern_summary'] = {
             'total_patterns': patterns.get('total', 0),
             'critical_patterns': patterns.get('critical', 0),
@@ -339,11 +497,11 @@ class DiagnosisGenerator:
         }
         
         # Critical events
-        evidence['critical_events'] = summary.get('critical_events', [])[:10]
+        evidence['critical_events'] = (summary.get('critical_events') or [])[:10]
         
         return evidence
     
-    def _extract_s3_references(self, analysis_results: Dict[str, Any]) -> List[str]:
+    def _extract_s3_references(self, analysis_results: Dict[str, Any], summary: Mapping[str, Any]) -> List[str]:
         """Extract S3 references from analysis results"""
         references = []
         
@@ -352,7 +510,6 @@ class DiagnosisGenerator:
             references.append(analysis_results['s3_uri'])
         
         # From summary
-        summary = analysis_results.get('summary', {})
         if 's3_uri' in summary:
             references.append(summary['s3_uri'])
         
@@ -367,7 +524,7 @@ class DiagnosisGenerator:
             if 's3_key' in baseline_file:
                 references.append(f"Baseline: {baseline_file['s3_key']}")
         
-        return list(set(references))  # Remove duplicates
+        return list(dict.fromkeys(references))  # Remove duplicates, keeping order
     
     def save_diagnosis_to_s3(
         self,
@@ -387,27 +544,39 @@ class DiagnosisGenerator:
         try:
             storage_manager = get_storage_manager()
             
-            # Convert diagnosis to JSON
-            diagnosis_json = json.dumps(asdict(diagnosis), indent=2)
+            # Convert diagnosis to sectioned NDJSON
+            diagnosis_json = _encode_sectioned_diagnosis(diagnosis.to_dict())
             
             # Generate S3 key
-            s3_key = f"sessions/{session_id}/analysis/diagnosis_{diagnosis.diagnosis_id}.json"
+            s3_key = f"sessions/{session_id}/analysis/diagnosis_{diagnosis.diagnosis_id}.ndjson"
+            
+            # Diagnosis ID, status, severity and timestamp live in the body (and the
+            # key embeds session and diagnosis IDs), so no S3 user metadata is sent
+            object_args = {
+                'ContentType': 'application/x-ndjson',
+                'ServerSideEncryption': 'AES256'
+            }
             
-            # Save to S3
-            storage_manager.s3_client.put_object(
-                Bucket=storage_manager.bucket_name,
-                Key=s3_key,
-                Body=diagnosis_json.encode('utf-8'),
-                ContentType='application/json',
-                ServerSideEncryption='AES256',
-                Metadata={
-                    'diagnosis-id': diagnosis.diagnosis_id,
-                    'session-id': session_id,
-                    'status': diagnosis.status,
-                    'severity': diagnosis.severity,
-                    'timestamp': diagnosis.timestamp
-                }
-            )
+            # Save to S3, streaming large diagnoses as a multipart upload
+            if len(diagnosis_json) < _MULTIPART_THRESHOLD:
+                storage_manager.s3_client.put_object(
+                    Bucket=storage_manager.bucket_name,
+                    Key=s3_key,
+                    Body=diagnosis_json,
+                    **object_args
+                )
+            else:
+                storage_manager.s3_client.upload_fileobj(
+                    BytesIO(diagnosis_json),
+                    Bucket=storage_manager.bucket_name,
+                    Key=s3_key,
+                    ExtraArgs=object_args,
+                    Config=TransferConfig(
+                        multipart_threshold=_MULTIPART_THRESHOLD,
+                        multipart_chunksize=_MULTIPART_THRESHOLD,  # S3 minimum part size
+                        use_threads=True
+                    )
+                )
             
             s3_uri = f"s3://{storage_manager.bucket_name}/{s3_key}"
             logger.info(f"Saved diagnosis to {s3_uri}")
@@ -419,15 +588,19 @@ class DiagnosisGenerator:
             raise
 
 
-# Global diagnosis generator instance
-_diagnosis_generator = None
+# Global diagnosis generator instance, built once under the lock so concurrent
+# first calls from the agent's threads share a single instance
+_diagnosis_generator: Optional[DiagnosisGenerator] = None
+_diagnosis_generator_lock = threading.Lock()
 
 
 def get_diagnosis_generator() -> DiagnosisGenerator:
     """Get or create global diagnosis generator instance"""
     global _diagnosis_generator
     if _diagnosis_generator is None:
-        _diagnosis_generator = DiagnosisGenerator()
+        with _diagnosis_generator_lock:
+            if _diagnosis_generator is None:
+                _diagnosis_generator = DiagnosisGenerator()
     return _diagnosis_generator
 
 
@@ -462,10 +635,10 @@ def generate_diagnosis(
         if s3_uri:
             if not s3_uri.startswith('s3://'):
                 return {'error': 'Invalid S3 URI format. Must start with s3://'}
-            parts = s3_uri.replace('s3://', '').split('/', 1)
-            if len(parts) != 2:
+            parsed_uri = _parse_s3_uri(s3_uri)
+            if parsed_uri is None:
                 return {'error': 'Invalid S3 URI format'}
-            s3_key = parts[1]
+            s3_key = parsed_uri[1]
         
         if not s3_key:
             return {'error': 'Either s3_uri or s3_key must be provided'}
@@ -480,8 +653,8 @@ def generate_diagnosis(
         if baseline_s3_uri or baseline_s3_key:
             # Parse baseline URI if provided
             if baseline_s3_uri:
-                parts = baseline_s3_uri.replace('s3://', '').split('/', 1)
-                baseline_s3_key = parts[1] if len(parts) == 2 else baseline_s3_key
+                parsed_uri = _parse_s3_uri(baseline_s3_uri)
+                baseline_s3_key = parsed_uri[1] if parsed_uri else baseline_s3_key
             
             # Compare with baseline
             analysis_results = analyzer.compare_s3_logs(s3_key, baseline_s3_key)
@@ -507,7 +680,7 @@ def generate_diagnosis(
             diagnosis_saved = False
         
         # Convert to dictionary
-        result = asdict(diagnosis)
+        result = diagnosis.to_dict()
         result['success'] = True
         result['diagnosis_saved_to_s3'] = diagnosis_saved
         if diagnosis_s3_uri:
@@ -527,7 +700,8 @@ def generate_diagnosis(
 def get_diagnosis_from_s3(
     diagnosis_id: str = "",
     session_id: str = "",
-    diagnosis_s3_uri: str = ""
+    diagnosis_s3_uri: str = "",
+    section: str = ""
 ) -> Dict[str, Any]:
     """
     Retrieve diagnosis from S3 storage.
@@ -536,6 +710,8 @@ def get_diagnosis_from_s3(
         diagnosis_id: Diagnosis ID to retrieve
         session_id: Session ID (required if using diagnosis_id)
         diagnosis_s3_uri: Direct S3 URI to diagnosis file
+        section: Optional single diagnosis field to retrieve (e.g. 'summary',
+                 'recommendations'); only that part of the object is downloaded
     
     Returns:
         Dictionary containing diagnosis information
@@ -547,18 +723,39 @@ def get_diagnosis_from_s3(
         if diagnosis_s3_uri:
             if not diagnosis_s3_uri.startswith('s3://'):
                 return {'error': 'Invalid S3 URI format'}
-            parts = diagnosis_s3_uri.replace('s3://', '').split('/', 1)
-            if len(parts) != 2:
+            parsed_uri = _parse_s3_uri(diagnosis_s3_uri)
+            if parsed_uri is None:
                 return {'error': 'Invalid S3 URI format'}
-            s3_key = parts[1]
+            s3_keys = (parsed_uri[1],)
         elif diagnosis_id and session_id:
-            s3_key = f"sessions/{session_id}/analysis/diagnosis_{diagnosis_id}.json"
+            # Diagnoses are stored as .ndjson; those saved before the sectioned
+            # format was introduced live under the old .json key
+            key_prefix = f"sessions/{session_id}/analysis/diagnosis_{diagnosis_id}"
+            s3_keys = (f"{key_prefix}.ndjson", f"{key_prefix}.json")
         else:
             return {'error': 'Either diagnosis_s3_uri or both diagnosis_id and session_id must be provided'}
         
-        # Retrieve from S3
-        content = storage_manager.stream_file_content(s3_key)
-        diagnosis_data = json.loads(content)
+        s3_client = storage_manager.s3_client
+        for s3_key in s3_keys:
+            try:
+                # Retrieve from S3 and parse the raw bytes without decoding to str first
+                if section:
+                    diagnosis_data = _read_diagnosis_section(
+                        s3_client, storage_manager.bucket_name, s3_key, section
+                    )
+                else:
+                    response = s3_client.get_object(
+                        Bucket=storage_manager.bucket_name,
+                        Key=s3_key
+                    )
+                    diagnosis_data = _decode_sectioned_diagnosis(response['Body'].read())
+                break
+            except s3_client.exceptions.NoSuchKey:
+                if s3_key == s3_keys[-1]:
+                    raise
+        
+        if diagnosis_data is None:
+            return {'error': f'Diagnosis has no section named {section}'}
         
         diagnosis_data['success'] = True
         diagnosis_data['retrieved_from'] = f"s3://{storage_manager.bucket_name}/{s3_key}"
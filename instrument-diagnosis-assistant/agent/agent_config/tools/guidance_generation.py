@@ -7,14 +7,64 @@ the multi-modal document processing tools to create structured troubleshooting g
 
 import re
 import logging
-from typing import Dict, List, Any, Optional
-from dataclasses import dataclass, asdict
+import functools
+from bisect import bisect_right
+from itertools import accumulate
+from typing import Dict, List, Any, Iterator, Optional, Tuple
+from dataclasses import dataclass
 from strands import tool
 
 logger = logging.getLogger(__name__)
 
+# Separator used to scan many step descriptions as one buffer. It is not
+# whitespace (unlike \x1e) and every open-ended class below excludes it, so
+# no match can run from one description into the next.
+_DESCRIPTION_SEPARATOR = "\x00"
 
-@dataclass
+# Extraction patterns, compiled once at import. Safety and tool alternatives
+# are merged into one pattern each so a description is scanned once per
+# category; each alternative has a single named group holding the text to keep.
+_SAFETY_PATTERN = re.compile(
+    r'(?:warning|caution|danger|safety)[:\-]?\s*(?P<labelled>[^.\n\x00]+)'
+    r'|(?P<precaution>(?:ensure|make sure|verify)[^.\x00]*(?:power|safety|protection)[^.\n\x00]*)'
+    r'|(?P<handling>(?:before|after)\s+(?:removing|installing|connecting)[^.\n\x00]*)',
+    re.IGNORECASE
+)
+
+_TOOL_PATTERN = re.compile(
+    r'(?:using|with|use)\s+(?:a\s+)?(?P<used>[a-zA-Z\s]+(?:screwdriver|wrench|tool|meter|gauge))'
+    r'|(?:tool|equipment)\s+(?:required|needed)[:\-]?\s*(?P<listed>[^.\n\x00]+)'
+    r'|(?P<named>[a-zA-Z\s]*(?:multimeter|oscilloscope|allen key|hex key|torque wrench))',
+    re.IGNORECASE
+)
+
+# Result patterns stay separate: they are tried in priority order
+_RESULT_PATTERNS = [
+    re.compile(r'(?:expected|should see|result)[:\-]?\s*([^.\n\x00]+)', re.IGNORECASE),
+    re.compile(r'(?:if successful|when complete)[:\-]?\s*([^.\n\x00]+)', re.IGNORECASE),
+    re.compile(r'(?:normal|correct)\s+(?:reading|value|result)[:\-]?\s*([^.\n\x00]+)', re.IGNORECASE)
+]
+
+# Literal prefilter: every match of a pattern contains one of its keywords,
+# so a buffer mentioning none of them cannot match and the scan is skipped
+_PATTERN_KEYWORDS = {
+    _SAFETY_PATTERN: ('warning', 'caution', 'danger', 'safety', 'ensure', 'make sure', 'verify', 'before', 'after'),
+    _TOOL_PATTERN: ('using', 'with', 'use', 'tool', 'equipment', 'multimeter', 'oscilloscope', 'allen key', 'hex key', 'torque wrench'),
+    _RESULT_PATTERNS[0]: ('expected', 'should see', 'result'),
+    _RESULT_PATTERNS[1]: ('if successful', 'when complete'),
+    _RESULT_PATTERNS[2]: ('normal', 'correct')
+}
+
+
+def _live_patterns(lowered: str) -> set:
+    """Return the patterns whose prefilter keywords occur in lowercased text"""
+    return {
+        pattern for pattern, keywords in _PATTERN_KEYWORDS.items()
+        if any(keyword in lowered for keyword in keywords)
+    }
+
+
+@dataclass(slots=True)
 class GuidanceStep:
     """Represents a structured troubleshooting step"""
     step_number: int
@@ -24,99 +74,179 @@ class GuidanceStep:
     expected_results: str
     safety_notes: List[str]
     tools_required: List[str]
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Build a shallow dict of the fields; nested values are already JSON-safe"""
+        return {
+            'step_number': self.step_number,
+            'title': self.title,
+            'description': self.description,
+            'visual_references': self.visual_references,
+            'expected_results': self.expected_results,
+            'safety_notes': self.safety_notes,
+            'tools_required': self.tools_required
+        }
 
 
 def extract_safety_notes(text: str) -> List[str]:
     """Extract safety-related information from text"""
-    safety_notes = []
-    safety_patterns = [
-        r'(?i)(?:warning|caution|danger|safety)[:\-]?\s*([^.\n]+)',
-        r'(?i)(?:ensure|make sure|verify)[^.]*(?:power|safety|protection)[^.\n]*',
-        r'(?i)(?:before|after)\s+(?:removing|installing|connecting)[^.\n]*'
-    ]
+    safety_notes = {}  # Insertion-ordered dedup
     
-    for pattern in safety_patterns:
-        matches = re.findall(pattern, text)
-        safety_notes.extend([match.strip() for match in matches if match.strip()])
+    for match in _SAFETY_PATTERN.finditer(text):
+        note = match.group(match.lastgroup).strip()
+        if note:
+            safety_notes[note] = None
     
-    return list(set(safety_notes))  # Remove duplicates
+    return list(safety_notes)
 
 
 def extract_tools_required(text: str) -> List[str]:
     """Extract required tools from text"""
-    tools = []
-    tool_patterns = [
-        r'(?i)(?:using|with|use)\s+(?:a\s+)?([a-zA-Z\s]+(?:screwdriver|wrench|tool|meter|gauge))',
-        r'(?i)(?:tool|equipment)\s+(?:required|needed)[:\-]?\s*([^.\n]+)',
-        r'(?i)([a-zA-Z\s]*(?:multimeter|oscilloscope|allen key|hex key|torque wrench))'
-    ]
+    tools = {}  # Insertion-ordered dedup
     
-    for pattern in tool_patterns:
-        matches = re.findall(pattern, text)
-        tools.extend([match.strip() for match in matches if match.strip()])
+    for match in _TOOL_PATTERN.finditer(text):
+        tool_name = match.group(match.lastgroup).strip()
+        if tool_name:
+            tools[tool_name] = None
     
-    return list(set(tools))  # Remove duplicates
+    return list(tools)
 
 
 def extract_expected_results(text: str) -> str:
     """Extract expected results from text"""
-    result_patterns = [
-        r'(?i)(?:expected|should see|result)[:\-]?\s*([^.\n]+)',
-        r'(?i)(?:if successful|when complete)[:\-]?\s*([^.\n]+)',
-        r'(?i)(?:normal|correct)\s+(?:reading|value|result)[:\-]?\s*([^.\n]+)'
-    ]
-    
-    for pattern in result_patterns:
-        matches = re.findall(pattern, text)
-        if matches:
-            return matches[0].strip()
+    for pattern in _RESULT_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            return match.group(1).strip()
     
     return ""
 
 
-def format_guidance_as_markdown(steps: List[GuidanceStep], visual_elements: List[Dict]) -> str:
-    """Format guidance steps as markdown"""
-    output = "# Troubleshooting Guidance\n\n"
+@functools.lru_cache(maxsize=64)
+def _extract_batch(descriptions: Tuple[str, ...],
+                   include_safety: bool = True) -> Tuple[Tuple[Tuple[str, ...], Tuple[str, ...], str], ...]:
+    """Extract safety notes, tools and expected result for many step descriptions.
+    
+    The descriptions are joined with _DESCRIPTION_SEPARATOR and each pattern is
+    run once over the joined buffer; matches are attributed back to their
+    description by offset. Results are cached on the description tuple so
+    regenerating the same guidance skips the scan; tuples keep them immutable.
+    The safety pattern is not run at all when include_safety is False.
+    """
+    joined = _DESCRIPTION_SEPARATOR.join(descriptions)
+    # End offset (exclusive, including the separator) of each description
+    ends = list(accumulate(len(description) + 1 for description in descriptions))
+    
+    # Keyword prefilter on a lowercase copy. Non-ASCII text is never
+    # prefiltered because IGNORECASE folds some characters (e.g. U+017F)
+    # that str.lower() leaves alone.
+    live_patterns = _live_patterns(joined.lower()) if joined.isascii() else _PATTERN_KEYWORDS.keys()
+    may_match = live_patterns.__contains__
+    
+    safety_notes = [{} for _ in descriptions]  # Insertion-ordered dedup
+    if include_safety and may_match(_SAFETY_PATTERN):
+        for match in _SAFETY_PATTERN.finditer(joined):
+            note = match.group(match.lastgroup).strip()
+            if note:
+                safety_notes[bisect_right(ends, match.start())][note] = None
+    
+    tools = [{} for _ in descriptions]  # Insertion-ordered dedup
+    if may_match(_TOOL_PATTERN):
+        for match in _TOOL_PATTERN.finditer(joined):
+            tool_name = match.group(match.lastgroup).strip()
+            if tool_name:
+                tools[bisect_right(ends, match.start())][tool_name] = None
+    
+    # First match of the highest-priority pattern wins for each description
+    expected_results = [None] * len(descriptions)
+    for pattern in _RESULT_PATTERNS:
+        if not may_match(pattern):
+            continue
+        for match in pattern.finditer(joined):
+            index = bisect_right(ends, match.start())
+            if expected_results[index] is None:
+                expected_results[index] = match.group(1).strip()
+    
+    return tuple(
+        (tuple(notes), tuple(step_tools), result or "")
+        for notes, step_tools, result in zip(safety_notes, tools, expected_results)
+    )
+
+
+# Markdown templates for the fixed parts of a rendered step
+_STEP_HEADER_TEMPLATE = "### Step {step_number}: {title}\n\n{description}\n\n"
+_EXPECTED_RESULT_TEMPLATE = "**Expected Result:** {expected_results}\n\n"
+
+
+@functools.lru_cache(maxsize=512)
+def _render_step_markdown(step_number: int,
+                          title: str,
+                          description: str,
+                          visual_references: Tuple[str, ...],
+                          expected_results: str,
+                          safety_notes: Tuple[str, ...],
+                          tools_required: Tuple[str, ...]) -> str:
+    """Render one guidance step as markdown (cached on the step's field values)"""
+    parts = [_STEP_HEADER_TEMPLATE.format(step_number=step_number, title=title, description=description)]
+    
+    if visual_references:
+        parts.append("**Visual References:**\n")
+        parts.extend(f"- {ref}\n" for ref in visual_references)
+        parts.append("\n")
+    
+    if tools_required:
+        parts.append("**Tools Required:**\n")
+        parts.extend(f"- {tool}\n" for tool in tools_required)
+        parts.append("\n")
+    
+    if safety_notes:
+        parts.append("**Safety Notes:**\n")
+        parts.extend(f"WARNING: {note}\n" for note in safety_notes)
+        parts.append("\n")
+    
+    if expected_results:
+        parts.append(_EXPECTED_RESULT_TEMPLATE.format(expected_results=expected_results))
+    
+    parts.append("---\n\n")
+    
+    return "".join(parts)
+
+
+def iter_guidance_markdown(steps: List[GuidanceStep], visual_elements: List[Dict]) -> Iterator[str]:
+    """Yield guidance markdown fragment by fragment, one block per step.
+    
+    Lets consumers stream large guidance without holding the whole document;
+    peak memory is bounded by the largest step rather than the full output.
+    """
+    yield "# Troubleshooting Guidance\n\n"
     
     # Add visual elements summary
     if visual_elements:
-        output += "## Visual References Available\n\n"
+        yield "## Visual References Available\n\n"
         for i, visual in enumerate(visual_elements):
             element_type = visual.get('element_type', 'element').title()
             description = visual.get('description', f'Visual element {i+1}')
-            output += f"- **{element_type} {i+1}:** {description}\n"
-        output += "\n"
+            yield f"- **{element_type} {i+1}:** {description}\n"
+        yield "\n"
     
-    # Add steps
-    output += "## Troubleshooting Steps\n\n"
+    # Add steps; each step block is rendered from a hashable key so unchanged
+    # steps are reused when the same guidance is regenerated
+    yield "## Troubleshooting Steps\n\n"
     for step in steps:
-        output += f"### Step {step.step_number}: {step.title}\n\n"
-        output += f"{step.description}\n\n"
-        
-        if step.visual_references:
-            output += "**Visual References:**\n"
-            for ref in step.visual_references:
-                output += f"- {ref}\n"
-            output += "\n"
-        
-        if step.tools_required:
-            output += "**Tools Required:**\n"
-            for tool in step.tools_required:
-                output += f"- {tool}\n"
-            output += "\n"
-        
-        if step.safety_notes:
-            output += "**Safety Notes:**\n"
-            for note in step.safety_notes:
-                output += f"WARNING: {note}\n"
-            output += "\n"
-        
-        if step.expected_results:
-            output += f"**Expected Result:** {step.expected_results}\n\n"
-        
-        output += "---\n\n"
-    
-    return output
+        yield _render_step_markdown(
+            step.step_number,
+            step.title,
+            step.description,
+            tuple(step.visual_references),
+            step.expected_results,
+            tuple(step.safety_notes),
+            tuple(step.tools_required)
+        )
+
+
+def format_guidance_as_markdown(steps: List[GuidanceStep], visual_elements: List[Dict]) -> str:
+    """Format guidance steps as markdown"""
+    return "".join(iter_guidance_markdown(steps, visual_elements))
 
 
 @tool(
@@ -145,40 +275,53 @@ def generate_guidance(
     """
     try:
         # Validate inputs
-        if 'error' in document_analysis:
+        if not isinstance(document_analysis, dict) or 'error' in document_analysis:
             return {"error": "Invalid document analysis provided"}
         
-        if 'error' in correlation_data:
+        if not isinstance(correlation_data, dict) or 'error' in correlation_data:
             return {"error": "Invalid correlation data provided"}
         
-        # Extract data from document analysis
-        analysis_data = document_analysis.get('document_analysis', {})
-        structured_sections = analysis_data.get('structured_sections', {})
-        procedures = structured_sections.get('procedures', [])
-        visual_elements = analysis_data.get('visual_elements', [])
+        # Extract data from document analysis (missing or null sections fall
+        # back to empty values)
+        analysis_data = document_analysis.get('document_analysis') or {}
+        structured_sections = analysis_data.get('structured_sections') or {}
+        procedures = structured_sections.get('procedures') or ()
+        visual_elements = analysis_data.get('visual_elements') or []
         
         # Get correlation mappings
-        correlations = correlation_data.get('correlation_mappings', {})
-        text_to_visual = correlations.get('text_to_visual', {})
+        correlations = correlation_data.get('correlation_mappings') or {}
+        text_to_visual = correlations.get('text_to_visual') or {}
         
-        # Generate structured steps
+        # Generate structured steps, accumulating metadata aggregates as we go
         guidance_steps = []
+        total_visual_references = 0
+        has_safety_notes = False
+        tools_identified = set()
+        visuals_referenced = set()
+        
+        # Extract safety notes, tools and results for all distinct descriptions
+        # in one batched regex scan
+        descriptions = [procedure.get('description', '') for procedure in procedures]
+        unique_descriptions = tuple(dict.fromkeys(descriptions))
+        extracted_by_description = dict(zip(
+            unique_descriptions, _extract_batch(unique_descriptions, include_safety)
+        ))
         
         for i, procedure in enumerate(procedures):
             step_number = procedure.get('step_number', i + 1)
             title = procedure.get('title', f'Step {step_number}')
-            description = procedure.get('description', '')
+            description = descriptions[i]
             
-            # Find visual references for this step
-            visual_refs = []
-            section_key = f"Step {step_number}" if f"Step {step_number}" in text_to_visual else title
-            if section_key in text_to_visual:
-                visual_refs = [ref['visual_id'] for ref in text_to_visual[section_key]]
+            # Find visual references for this step (step key first, then title)
+            section_correlations = text_to_visual.get(f"Step {step_number}")
+            if section_correlations is None:
+                section_correlations = text_to_visual.get(title)
+            visual_refs = [ref['visual_id'] for ref in section_correlations] if section_correlations else []
             
             # Extract safety notes and tools
-            safety_notes = extract_safety_notes(description) if include_safety else []
-            tools_required = extract_tools_required(description)
-            expected_results = extract_expected_results(description)
+            safety, tools, expected_results = extracted_by_description[description]
+            safety_notes = list(safety)
+            tools_required = list(tools)
             
             step = GuidanceStep(
                 step_number=step_number,
@@ -191,6 +334,14 @@ def generate_guidance(
             )
             
             guidance_steps.append(step)
+            
+            total_visual_references += len(visual_refs)
+            has_safety_notes = has_safety_notes or bool(safety_notes)
+            tools_identified.update(tools_required)
+            visuals_referenced.update(visual_refs)
+        
+        # Serialize steps once; the structured format reuses them in two places
+        structured_steps = [step.to_dict() for step in guidance_steps] if output_format == "structured" else None
         
         # Format output based on requested format
         if output_format == "markdown":
@@ -198,39 +349,40 @@ def generate_guidance(
         elif output_format == "structured":
             formatted_guidance = {
                 'visual_elements': visual_elements,
-                'troubleshooting_steps': [asdict(step) for step in guidance_steps]
+                'troubleshooting_steps': structured_steps
             }
         else:  # plain_text
-            formatted_guidance = "TROUBLESHOOTING GUIDANCE\n" + "=" * 50 + "\n\n"
+            parts = ["TROUBLESHOOTING GUIDANCE\n" + "=" * 50 + "\n\n"]
             for step in guidance_steps:
-                formatted_guidance += f"STEP {step.step_number}: {step.title.upper()}\n"
-                formatted_guidance += f"{step.description}\n\n"
+                parts.append(f"STEP {step.step_number}: {step.title.upper()}\n{step.description}\n\n")
+            formatted_guidance = "".join(parts)
         
         # Generate guidance metadata
         guidance_metadata = {
             'guidance_type': guidance_type,
             'output_format': output_format,
             'total_steps': len(guidance_steps),
-            'total_visual_references': sum(len(step.visual_references) for step in guidance_steps),
-            'safety_notes_included': include_safety and any(step.safety_notes for step in guidance_steps),
-            'tools_identified': len(set(tool for step in guidance_steps for tool in step.tools_required)),
+            'total_visual_references': total_visual_references,
+            'safety_notes_included': include_safety and has_safety_notes,
+            'tools_identified': len(tools_identified),
         }
         
-        # Calculate average correlation strength
-        all_strengths = []
+        # Calculate average correlation strength (running sum, no temporary list)
+        strength_sum = 0.0
+        strength_count = 0
         for section_correlations in text_to_visual.values():
             for corr in section_correlations:
-                strength = corr.get('strength', 0.0)
-                all_strengths.append(strength)
-        avg_correlation_strength = sum(all_strengths) / len(all_strengths) if all_strengths else 0.0
+                strength_sum += corr.get('strength', 0.0)
+                strength_count += 1
+        avg_correlation_strength = strength_sum / strength_count if strength_count else 0.0
         
         # Create comprehensive result
         result = {
             'formatted_guidance': formatted_guidance,
-            'structured_steps': [asdict(step) for step in guidance_steps] if output_format == "structured" else None,
+            'structured_steps': structured_steps,
             'visual_integration': {
                 'total_visuals': len(visual_elements),
-                'visuals_referenced': len(set(ref for step in guidance_steps for ref in step.visual_references)),
+                'visuals_referenced': len(visuals_referenced),
                 'correlation_strength': avg_correlation_strength
             },
             'guidance_metadata': guidance_metadata,
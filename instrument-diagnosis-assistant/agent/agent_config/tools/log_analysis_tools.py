@@ -8,17 +8,36 @@ and extracting failure patterns for diagnosis generation.
 import os
 import re
 import json
+import mmap
+import multiprocessing
 import hashlib
-from typing import Dict, List, Any, Optional, Tuple
-from dataclasses import dataclass, asdict
+import functools
+import threading
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from itertools import repeat
+from typing import Dict, List, Any, Iterator, Optional, Sequence, Tuple, Union
+from dataclasses import dataclass
 from pathlib import Path
 import logging
 from strands import tool
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(slots=True)
 class LogAnalysisResult:
     """Result of log analysis operation"""
     status: str  # "PASS", "FAIL", "UNCERTAIN"
@@ -27,29 +46,93 @@ class LogAnalysisResult:
     comparison_summary: str
     recommendations: List[str]
     processing_stats: Dict[str, Any]
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the fields as a plain dict; lists and stats are shared rather than deep-copied"""
+        return {
+            'status': self.status,
+            'confidence': self.confidence,
+            'failure_indicators': self.failure_indicators,
+            'comparison_summary': self.comparison_summary,
+            'recommendations': self.recommendations,
+            'processing_stats': self.processing_stats
+        }
 
 
-@dataclass
+@dataclass(slots=True)
 class LogChunk:
     """Represents a chunk of log data for processing"""
     chunk_id: int
-    content: str
+    content: bytes
     start_line: int
     end_line: int
     size_bytes: int
 
 
-@dataclass
+@dataclass(slots=True)
 class FailurePattern:
     """Represents a detected failure pattern"""
     pattern_type: str
     severity: str  # "CRITICAL", "WARNING", "INFO"
     description: str
-    matched_lines: List[str]
+    matched_lines: List[str]  # First _MAX_MATCHED_LINES matches
     confidence: float
+    match_count: int  # Total matching lines, including those not kept in matched_lines
     timestamp_range: Optional[Tuple[str, str]] = None
 
 
+# Window size for the pattern scan in extract_patterns
+_SCAN_WINDOW_SIZE = 8 * 1024 * 1024
+
+# Matched lines kept per pattern type
+_MAX_MATCHED_LINES = 10
+
+
+def _line_aligned_end(buffer: Union[str, bytes, mmap.mmap], newline: Union[str, bytes], start: int, budget: int) -> int:
+    """Return the end of the longest run of whole lines from start that fits
+    in budget; a single line longer than the budget is returned whole"""
+    length = len(buffer)
+    limit = start + budget
+    if limit >= length:
+        return length
+    cut = buffer.rfind(newline, start, limit)
+    if cut < 0:
+        cut = buffer.find(newline, limit)
+    return cut + 1 if cut >= 0 else length
+
+
+def _newline_offsets(buffer: Union[bytes, mmap.mmap], start: int = 0, end: Optional[int] = None) -> 'np.ndarray':
+    """Return the offsets of every newline in buffer[start:end] (requires numpy).
+    
+    Built window by window so the temporary comparison array stays small.
+    """
+    end = len(buffer) if end is None else end
+    parts = [
+        window_start + np.flatnonzero(
+            np.frombuffer(buffer, np.uint8, count=min(_SCAN_WINDOW_SIZE, end - window_start), offset=window_start) == 0x0A
+        )
+        for window_start in range(start, end, _SCAN_WINDOW_SIZE)
+    ]
+    return np.concatenate(parts) if parts else np.empty(0, dtype=np.intp)
+
+
+@contextmanager
+def _open_mapped(path: str) -> Iterator[Tuple[Union[mmap.mmap, bytes], int]]:
+    """Map a log file read-only so the pattern scan walks the page cache
+    instead of a heap copy; yields (buffer, size) and unmaps on exit"""
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            # mmap rejects zero-length mappings
+            yield b"", 0
+            return
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        yield mapped, size
+    finally:
+        mapped.close()
+
+
 class LogProcessor:
     """Core log processing functionality"""
     
@@ -90,72 +173,83 @@ class LogProcessor:
                 'description': 'Driver-related issues detected'
             }
         }
+        
+        # Compile each pattern once, in text and bytes form, instead of on
+        # every extract_patterns call
+        for cfg in self.failure_patterns.values():
+            cfg['compiled'] = re.compile(cfg['regex'])
+            cfg['compiled_bytes'] = re.compile(cfg['regex'].encode('ascii'))
+        
+        # All patterns merged into one alternation with a named group per
+        # pattern type, so a single scan finds lines matching any of them.
+        # The patterns are ASCII, so a bytes twin lets files be scanned
+        # without decoding them first
+        combined = '|'.join(f"(?P<{name}>{cfg['regex'].removeprefix('(?i)')})"
+                            for name, cfg in self.failure_patterns.items())
+        self._combined_pattern = re.compile(combined, re.IGNORECASE)
+        self._combined_bytes_pattern = re.compile(combined.encode('ascii'), re.IGNORECASE)
     
     def validate_file(self, file_path: str) -> Tuple[bool, str]:
         """Validate log file before processing"""
+        valid, message, mapped = self.validate_and_open(file_path)
+        if mapped is not None:
+            mapped.close()
+        return valid, message
+    
+    def validate_and_open(self, file_path: str) -> Tuple[bool, str, Optional[mmap.mmap]]:
+        """Validate a log file and, if it passes, return it mapped read-only so
+        the caller scans the mapping validation already opened; the caller
+        closes it"""
         try:
             if not os.path.exists(file_path):
-                return False, f"File not found: {file_path}"
+                return False, f"File not found: {file_path}", None
             
-            file_size = os.path.getsize(file_path)
-            if file_size > self.max_file_size_bytes:
-                return False, f"File too large: {file_size / (1024*1024):.1f}MB (max: {self.max_file_size_bytes / (1024*1024)}MB)"
+            with open(file_path, 'rb') as f:
+                file_size = os.fstat(f.fileno()).st_size
+                if file_size > self.max_file_size_bytes:
+                    return False, f"File too large: {file_size / (1024*1024):.1f}MB (max: {self.max_file_size_bytes / (1024*1024)}MB)", None
+                if file_size == 0:
+                    return False, "File appears to be empty or unreadable", None
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
             
             # Try to read first few lines to validate format
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                first_lines = [f.readline() for _ in range(5)]
-                if not any(line.strip() for line in first_lines):
-                    return False, "File appears to be empty or unreadable"
+            first_lines = [mapped.readline() for _ in range(5)]
+            if not any(line.strip() for line in first_lines):
+                mapped.close()
+                return False, "File appears to be empty or unreadable", None
+            mapped.seek(0)
             
-            return True, "File validation passed"
+            return True, "File validation passed", mapped
             
         except Exception as e:
-            return False, f"File validation error: {str(e)}"
+            return False, f"File validation error: {str(e)}", None
     
     def chunk_file(self, file_path: str) -> List[LogChunk]:
         """Split large log file into manageable chunks"""
         chunks = []
-        chunk_id = 0
         
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                current_chunk = ""
-                current_size = 0
+            with _open_mapped(file_path) as (mapped, size):
+                start = 0
                 start_line = 1
-                line_number = 0
                 
-                for line in f:
-                    line_number += 1
-                    line_size = len(line.encode('utf-8'))
+                while start < size:
+                    # Cut on a line boundary found in the mapping instead of
+                    # accumulating lines
+                    end = _line_aligned_end(mapped, b'\n', start, self.chunk_size_bytes)
                     
-                    if current_size + line_size > self.chunk_size_bytes and current_chunk:
-                        # Create chunk
-                        chunks.append(LogChunk(
-                            chunk_id=chunk_id,
-                            content=current_chunk,
-                            start_line=start_line,
-                            end_line=line_number - 1,
-                            size_bytes=current_size
-                        ))
-                        
-                        # Reset for next chunk
-                        chunk_id += 1
-                        current_chunk = line
-                        current_size = line_size
-                        start_line = line_number
-                    else:
-                        current_chunk += line
-                        current_size += line_size
-                
-                # Add final chunk if there's remaining content
-                if current_chunk:
+                    content = mapped[start:end]
+                    line_count = content.count(b'\n') + (not content.endswith(b'\n'))
                     chunks.append(LogChunk(
-                        chunk_id=chunk_id,
-                        content=current_chunk,
+                        chunk_id=len(chunks),
+                        content=content,
                         start_line=start_line,
-                        end_line=line_number,
-                        size_bytes=current_size
+                        end_line=start_line + line_count - 1,
+                        size_bytes=end - start
                     ))
+                    
+                    start = end
+                    start_line += line_count
             
             logger.info(f"Split file into {len(chunks)} chunks")
             return chunks
@@ -164,40 +258,140 @@ class LogProcessor:
             logger.error(f"Error chunking file {file_path}: {str(e)}")
             raise
     
-    def extract_patterns(self, content: str) -> List[FailurePattern]:
-        """Extract failure patterns from log content"""
+    def extract_patterns(self, content: Union[str, bytes, mmap.mmap]) -> List[FailurePattern]:
+        """Extract failure patterns from log content (text, or raw bytes / a mapped file)"""
+        return self.extract_patterns_range(content, 0, len(content))
+    
+    def extract_patterns_range(self, content: Union[str, bytes, mmap.mmap], start: int, end: int,
+                               newline_offsets: Optional['np.ndarray'] = None) -> List[FailurePattern]:
+        """Extract failure patterns from content[start:end] without slicing it.
+        
+        start and end must fall on line boundaries; line numbers in matched
+        lines count from start. newline_offsets, an index of every newline in
+        content from _newline_offsets, is reused instead of rescanning the range.
+        """
         patterns = []
-        lines = content.split('\n')
+        text_mode = isinstance(content, str)
+        if text_mode:
+            newline = '\n'
+            combined_pattern = self._combined_pattern
+            regexes = {name: cfg['compiled'] for name, cfg in self.failure_patterns.items()}
+        else:
+            newline = b'\n'
+            combined_pattern = self._combined_bytes_pattern
+            regexes = {name: cfg['compiled_bytes'] for name, cfg in self.failure_patterns.items()}
+        if isinstance(content, mmap.mmap):
+            # mmap has find/rfind but no count, so count on the slice between hits
+            def count_newlines(start: int, end: int) -> int:
+                return content[start:end].count(b'\n')
+        else:
+            def count_newlines(start: int, end: int) -> int:
+                return content.count(newline, start, end)
+        # Every matching line is counted, but only the first few per pattern
+        # are kept, so a pattern flooding the log costs a counter increment
+        # per line rather than a line number, a decode and a string
+        match_counts = {name: 0 for name in self.failure_patterns}
+        samples = {name: [] for name in self.failure_patterns}
         
-        for pattern_name, pattern_config in self.failure_patterns.items():
-            regex = re.compile(pattern_config['regex'])
-            matched_lines = []
+        def regex_hits(window_start: int, window_end: int) -> Iterator[Tuple[int, str]]:
+            # One combined scan finds a hit on every line that matches any
+            # pattern, then resumes after that line; lastgroup names the
+            # pattern that fired
+            match = combined_pattern.search(content, window_start, window_end)
+            while match:
+                yield match.start(), match.lastgroup
+                next_line = content.find(newline, match.end(), window_end)
+                if next_line < 0:
+                    return
+                match = combined_pattern.search(content, next_line + 1, window_end)
+        
+        # The content is scanned in windows that end on line boundaries, so
+        # no match straddles two windows and the newline index only ever
+        # covers one window
+        line_num = 1
+        counted_to = start
+        lines_before_window = 0
+        window_start = start
+        while window_start < end:
+            window_end = min(_line_aligned_end(content, newline, window_start, _SCAN_WINDOW_SIZE), end)
+            
+            # With numpy, raw bytes get every newline offset in the window from
+            # one vectorized compare (or a view of the caller's index); a hit's
+            # line number and bounds are then a binary search instead of
+            # find/rfind calls and newline counting
+            window_offsets = None
+            if newline_offsets is not None:
+                window_offsets = newline_offsets[
+                    newline_offsets.searchsorted(window_start):newline_offsets.searchsorted(window_end)
+                ]
+            elif np is not None and not text_mode:
+                window_offsets = _newline_offsets(content, window_start, window_end)
             
-            for line_num, line in enumerate(lines, 1):
-                if regex.search(line):
-                    matched_lines.append(f"Line {line_num}: {line.strip()}")
+            # Each hit line is checked against every pattern, so a line can
+            # count towards several pattern types. Without the offset index,
+            # line numbers come from counting newlines between hit lines
+            for position, fired in regex_hits(window_start, window_end):
+                if window_offsets is not None:
+                    line_index = int(window_offsets.searchsorted(position))
+                    line_start = int(window_offsets[line_index - 1]) + 1 if line_index else window_start
+                    line_end = int(window_offsets[line_index]) if line_index < len(window_offsets) else window_end
+                else:
+                    previous_newline = content.rfind(newline, window_start, position)
+                    line_start = previous_newline + 1 if previous_newline >= 0 else window_start
+                    line_end = content.find(newline, position, window_end)
+                    if line_end < 0:
+                        line_end = window_end
+                line = content[line_start:line_end]
+                matched = [name for name, regex in regexes.items() if name == fired or regex.search(line)]
+                if not matched:
+                    continue
+                for pattern_name in matched:
+                    match_counts[pattern_name] += 1
+                sampled = [name for name in matched if len(samples[name]) < _MAX_MATCHED_LINES]
+                if not sampled:
+                    continue
+                if window_offsets is not None:
+                    line_num = lines_before_window + line_index + 1
+                else:
+                    line_num += count_newlines(counted_to, line_start)
+                    counted_to = line_start
+                # Only matched lines are ever decoded when scanning raw bytes
+                text = line if text_mode else line.decode('utf-8', errors='ignore')
+                entry = f"Line {line_num}: {text.strip()}"
+                for pattern_name in sampled:
+                    samples[pattern_name].append(entry)
+            
+            if window_offsets is not None:
+                lines_before_window += len(window_offsets)
+            window_start = window_end
+        
+        for pattern_name, pattern_config in self.failure_patterns.items():
+            match_count = match_counts[pattern_name]
             
-            if matched_lines:
+            if match_count:
                 # Calculate confidence based on number of matches and severity
                 base_confidence = 0.7 if pattern_config['severity'] == 'CRITICAL' else 0.5
-                match_boost = min(0.3, len(matched_lines) * 0.1)
+                match_boost = min(0.3, match_count * 0.1)
                 confidence = min(1.0, base_confidence + match_boost)
                 
                 patterns.append(FailurePattern(
                     pattern_type=pattern_name,
                     severity=pattern_config['severity'],
                     description=pattern_config['description'],
-                    matched_lines=matched_lines[:10],  # Limit to first 10 matches
-                    confidence=confidence
+                    matched_lines=samples[pattern_name],  # First _MAX_MATCHED_LINES matches
+                    confidence=confidence,
+                    match_count=match_count
                 ))
         
         return patterns
     
-    def compare_with_baseline(self, test_content: str, baseline_content: str) -> Dict[str, Any]:
+    def compare_with_baseline(self, test_content: Union[str, bytes], baseline_content: Union[str, bytes]) -> Dict[str, Any]:
         """Compare test log content with baseline (gold standard)"""
-        test_patterns = self.extract_patterns(test_content)
-        baseline_patterns = self.extract_patterns(baseline_content)
-        
+        return self.compare_patterns(self.extract_patterns(test_content), self.extract_patterns(baseline_content))
+    
+    def compare_patterns(self, test_patterns: Sequence[FailurePattern],
+                         baseline_patterns: Sequence[FailurePattern]) -> Dict[str, Any]:
+        """Compare already-extracted test patterns with baseline (gold standard) patterns"""
         # Count critical vs warning patterns
         test_critical = len([p for p in test_patterns if p.severity == 'CRITICAL'])
         test_warnings = len([p for p in test_patterns if p.severity == 'WARNING'])
@@ -222,6 +416,9 @@ class LogProcessor:
             status = "BASELINE_MATCH"
             severity = "INFO"
         
+        # Baseline pattern types as a set, built once for the membership test
+        baseline_types = {bp.pattern_type for bp in baseline_patterns}
+        
         return {
             'status': status,
             'severity': severity,
@@ -229,8 +426,7 @@ class LogProcessor:
             'baseline_patterns': len(baseline_patterns),
             'critical_deviation': critical_deviation,
             'warning_deviation': warning_deviation,
-            'unique_test_patterns': [p.pattern_type for p in test_patterns 
-                                   if p.pattern_type not in [bp.pattern_type for bp in baseline_patterns]]
+            'unique_test_patterns': [p.pattern_type for p in test_patterns if p.pattern_type not in baseline_types]
         }
 
 
@@ -238,6 +434,236 @@ class LogProcessor:
 _log_processor = LogProcessor()
 
 
+# Total bytes of work below which scans run inline; smaller jobs finish
+# before worker processes would have started
+_PARALLEL_MIN_BYTES = 64 * 1024 * 1024
+
+# Worker processes are opt-in: forkserver/spawn workers re-import the entry
+# module, and this agent's main.py loads config and builds AWS clients at
+# import time. LOG_ANALYSIS_WORKERS sets the worker count (unset or below 2
+# keeps every scan in-process); it is capped by the CPUs this process may use
+_WORKERS_ENV_VAR = 'LOG_ANALYSIS_WORKERS'
+_MAX_POOL_WORKERS = 4
+
+# Worker pool shared by every tool call, created on first use
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _pool_worker_count() -> int:
+    """Number of worker processes scans may use; 0 when the pool is not enabled"""
+    try:
+        requested = int(os.environ.get(_WORKERS_ENV_VAR, '0'))
+    except ValueError:
+        logger.warning(f"Ignoring non-integer {_WORKERS_ENV_VAR}; scanning in-process")
+        return 0
+    if requested < 2:
+        return 0
+    try:
+        available = len(os.sched_getaffinity(0))
+    except AttributeError:
+        # No affinity API (macOS)
+        available = os.cpu_count() or 1
+    workers = min(requested, available, _MAX_POOL_WORKERS)
+    return workers if workers > 1 else 0
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    """Return the shared worker pool. Workers start from a fresh interpreter
+    (forkserver, or spawn where unavailable) rather than fork, which could copy
+    a lock held by another of the agent server's threads into the child"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                start_methods = multiprocessing.get_all_start_methods()
+                context = multiprocessing.get_context('forkserver' if 'forkserver' in start_methods else 'spawn')
+                _executor = ProcessPoolExecutor(max_workers=_pool_worker_count(), mp_context=context)
+    return _executor
+
+
+def _pool_map(fn, *iterables) -> List[Any]:
+    """Run fn over the iterables in the shared pool, keeping input order"""
+    global _executor
+    executor = _get_executor()
+    try:
+        return list(executor.map(fn, *iterables))
+    except BrokenProcessPool:
+        # A worker died; drop the pool so the next call starts a fresh one
+        with _executor_lock:
+            if _executor is executor:
+                _executor = None
+        raise
+
+
+def _use_pool(task_count: int, total_bytes: int) -> bool:
+    """Whether the pool is enabled and the work is large enough to be worth
+    handing to worker processes"""
+    return task_count > 1 and total_bytes >= _PARALLEL_MIN_BYTES and _pool_worker_count() > 1
+
+
+# analyze_logs results keyed by (SHA-256 of the test file, baseline version),
+# stored as JSON snapshots so a hit hands back a fresh, independent dict
+_ANALYSIS_CACHE_SIZE = 64
+_analysis_cache: Dict[Tuple[str, Optional[Tuple[str, int, int]]], bytes] = {}
+_analysis_cache_lock = threading.Lock()
+
+
+def _cache_get(cache_key: Tuple[str, Optional[Tuple[str, int, int]]]) -> Optional[bytes]:
+    """Look up a cached analysis snapshot"""
+    with _analysis_cache_lock:
+        return _analysis_cache.get(cache_key)
+
+
+def _cache_put(cache_key: Tuple[str, Optional[Tuple[str, int, int]]], snapshot: bytes) -> None:
+    """Store an analysis snapshot, evicting the oldest entry once the cache is full;
+    the lock keeps concurrent tool calls from evicting the same key twice"""
+    with _analysis_cache_lock:
+        if len(_analysis_cache) >= _ANALYSIS_CACHE_SIZE:
+            # Evict the oldest entry (dicts keep insertion order)
+            _analysis_cache.pop(next(iter(_analysis_cache), None), None)
+        _analysis_cache[cache_key] = snapshot
+
+
+def _snapshot_result(result: LogAnalysisResult) -> bytes:
+    """Serialize an analysis result to JSON bytes; orjson encodes the slotted
+    dataclass directly, without building an intermediate dict"""
+    if orjson is not None:
+        return orjson.dumps(result)
+    return json.dumps(result.to_dict()).encode('utf-8')
+
+
+def _restore_result(snapshot: bytes) -> Dict[str, Any]:
+    """Parse a cached analysis snapshot back into a result dict"""
+    if orjson is not None:
+        return orjson.loads(snapshot)
+    return json.loads(snapshot)
+
+
+@functools.lru_cache(maxsize=16)
+def _baseline_patterns_cached(path: str, mtime_ns: int, size: int) -> Tuple[FailurePattern, ...]:
+    """Extract a baseline's patterns once; mtime and size are part of the key so an edited file is rescanned"""
+    with _open_mapped(path) as (content, _):
+        return tuple(_log_processor.extract_patterns(content))
+
+
+def _resolve_baseline(baseline_log_path: str) -> Optional[Tuple[str, int, int]]:
+    """Validate the optional baseline log; its path, mtime and size identify the
+    version an analysis is compared against. Returns None for standalone analysis"""
+    if not baseline_log_path or not baseline_log_path.strip():
+        return None
+    baseline_valid, baseline_msg = _log_processor.validate_file(baseline_log_path)
+    if not baseline_valid:
+        logger.warning(f"Baseline log validation failed: {baseline_msg}. Proceeding with standalone analysis.")
+        return None
+    baseline_stat = os.stat(baseline_log_path)
+    return (baseline_log_path, baseline_stat.st_mtime_ns, baseline_stat.st_size)
+
+
+def _build_analysis_result(
+    test_patterns: List[FailurePattern],
+    test_file_size: int,
+    baseline_key: Optional[Tuple[str, int, int]],
+    baseline_patterns: Sequence[FailurePattern]
+) -> LogAnalysisResult:
+    """Turn a test log's patterns, and the baseline's when there is one, into an analysis result"""
+    # Handle optional baseline
+    baseline_file_size = 0
+    comparison = None
+    
+    if baseline_key is not None:
+        baseline_file_size = baseline_key[2]
+        # Compare the patterns already extracted rather than scanning
+        # both files again
+        comparison = _log_processor.compare_patterns(test_patterns, baseline_patterns)
+    
+    # Determine analysis mode
+    has_baseline = comparison is not None
+    
+    # Generate recommendations based on findings
+    recommendations = []
+    critical_patterns = [p for p in test_patterns if p.severity == 'CRITICAL']
+    warning_patterns = [p for p in test_patterns if p.severity == 'WARNING']
+    
+    if has_baseline:
+        # Baseline comparison recommendations
+        if comparison['critical_deviation'] > 0:
+            recommendations.append("CRITICAL: Investigate connection timeouts and service failures immediately")
+        if comparison['warning_deviation'] > 2:
+            recommendations.append("WARNING: Multiple performance issues detected - check system resources")
+        if comparison['status'] == 'BASELINE_MATCH':
+            recommendations.append("System appears to be operating within normal parameters")
+    else:
+        # Standalone analysis recommendations
+        if critical_patterns:
+            recommendations.append("CRITICAL: Critical failure patterns detected - immediate investigation required")
+        if len(warning_patterns) > 3:
+            recommendations.append("WARNING: Multiple warning patterns detected - system monitoring recommended")
+        if not test_patterns:
+            recommendations.append("INFO: No obvious failure patterns detected in log analysis")
+    
+    # Determine status and confidence
+    if has_baseline:
+        # Use comparison-based status
+        status = "FAIL" if comparison['critical_deviation'] > 0 else \
+                "UNCERTAIN" if comparison['warning_deviation'] > 1 else "PASS"
+        confidence = 0.9 if comparison['critical_deviation'] > 0 else \
+                    0.7 if comparison['warning_deviation'] > 0 else 0.85
+        comparison_summary = f"Found {len(test_patterns)} patterns vs {len(baseline_patterns)} in baseline. Status: {comparison['status']}"
+    else:
+        # Use standalone analysis status
+        status = "FAIL" if critical_patterns else \
+                "UNCERTAIN" if len(warning_patterns) > 2 else "PASS"
+        confidence = 0.85 if critical_patterns else \
+                    0.7 if warning_patterns else 0.8
+        comparison_summary = f"Standalone analysis: Found {len(test_patterns)} patterns ({len(critical_patterns)} critical, {len(warning_patterns)} warnings). No baseline comparison available."
+    
+    # Build result
+    return LogAnalysisResult(
+        status=status,
+        confidence=confidence,
+        failure_indicators=[p.description for p in critical_patterns],
+        comparison_summary=comparison_summary,
+        recommendations=recommendations,
+        processing_stats={
+            'test_file_size': test_file_size,
+            'baseline_file_size': baseline_file_size,
+            'patterns_detected': len(test_patterns),
+            'critical_patterns': len(critical_patterns),
+            'warning_patterns': len(warning_patterns),
+            'has_baseline': has_baseline,
+            'comparison_result': comparison
+        }
+    )
+
+
+def _analyze_uncached(
+    test_log_path: str,
+    baseline_key: Optional[Tuple[str, int, int]],
+    baseline_patterns: Sequence[FailurePattern]
+) -> Union[bytes, Dict[str, Any]]:
+    """Analyze one test log for analyze_multiple_logs against already extracted
+    baseline patterns, bypassing the cache. Returns the result's snapshot, or an
+    error dict; module level so worker processes can unpickle it"""
+    logger.info(f"Processing file: {test_log_path}")
+    try:
+        test_valid, test_msg, test_content = _log_processor.validate_and_open(test_log_path)
+        if not test_valid:
+            return {"error": f"Test log validation failed: {test_msg}"}
+        
+        try:
+            test_file_size = len(test_content)
+            test_patterns = _log_processor.extract_patterns(test_content)
+        finally:
+            test_content.close()
+        
+        return _snapshot_result(_build_analysis_result(test_patterns, test_file_size, baseline_key, baseline_patterns))
+        
+    except Exception as e:
+        logger.error(f"Error in analyze_logs: {str(e)}")
+        return {"error": f"Analysis failed: {str(e)}"}
+
+
 @tool(
     name="analyze_logs",
     description="Analyze log files with optional gold standard comparison to identify failures and anomalies. Can process single files or multiple files in batch."
@@ -259,95 +685,36 @@ def analyze_logs(
         Dictionary containing analysis results with status, patterns, and recommendations
     """
     try:
-        # Validate test log file
-        test_valid, test_msg = _log_processor.validate_file(test_log_path)
+        # Validate test log file, keeping the mapping validation opened so
+        # the file is opened once for both validation and the scan
+        test_valid, test_msg, test_content = _log_processor.validate_and_open(test_log_path)
         if not test_valid:
             return {"error": f"Test log validation failed: {test_msg}"}
         
-        # Read test file content
-        with open(test_log_path, 'r', encoding='utf-8', errors='ignore') as f:
-            test_content = f.read()
-        
-        # Extract patterns from test file
-        test_patterns = _log_processor.extract_patterns(test_content)
-        
-        # Handle optional baseline
-        baseline_content = ""
-        baseline_patterns = []
-        comparison = None
-        
-        if baseline_log_path and baseline_log_path.strip():
-            # Validate baseline file if provided
-            baseline_valid, baseline_msg = _log_processor.validate_file(baseline_log_path)
-            if baseline_valid:
-                with open(baseline_log_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    baseline_content = f.read()
-                
-                baseline_patterns = _log_processor.extract_patterns(baseline_content)
-                comparison = _log_processor.compare_with_baseline(test_content, baseline_content)
-            else:
-                logger.warning(f"Baseline log validation failed: {baseline_msg}. Proceeding with standalone analysis.")
-        
-        # Determine analysis mode
-        has_baseline = comparison is not None
-        
-        # Generate recommendations based on findings
-        recommendations = []
-        critical_patterns = [p for p in test_patterns if p.severity == 'CRITICAL']
-        warning_patterns = [p for p in test_patterns if p.severity == 'WARNING']
-        
-        if has_baseline:
-            # Baseline comparison recommendations
-            if comparison['critical_deviation'] > 0:
-                recommendations.append("CRITICAL: Investigate connection timeouts and service failures immediately")
-            if comparison['warning_deviation'] > 2:
-                recommendations.append("WARNING: Multiple performance issues detected - check system resources")
-            if comparison['status'] == 'BASELINE_MATCH':
-                recommendations.append("System appears to be operating within normal parameters")
-        else:
-            # Standalone analysis recommendations
-            if critical_patterns:
-                recommendations.append("CRITICAL: Critical failure patterns detected - immediate investigation required")
-            if len(warning_patterns) > 3:
-                recommendations.append("WARNING: Multiple warning patterns detected - system monitoring recommended")
-            if not test_patterns:
-                recommendations.append("INFO: No obvious failure patterns detected in log analysis")
-        
-        # Determine status and confidence
-        if has_baseline:
-            # Use comparison-based status
-            status = "FAIL" if comparison['critical_deviation'] > 0 else \
-                    "UNCERTAIN" if comparison['warning_deviation'] > 1 else "PASS"
-            confidence = 0.9 if comparison['critical_deviation'] > 0 else \
-                        0.7 if comparison['warning_deviation'] > 0 else 0.85
-            comparison_summary = f"Found {len(test_patterns)} patterns vs {len(baseline_patterns)} in baseline. Status: {comparison['status']}"
-        else:
-            # Use standalone analysis status
-            status = "FAIL" if critical_patterns else \
-                    "UNCERTAIN" if len(warning_patterns) > 2 else "PASS"
-            confidence = 0.85 if critical_patterns else \
-                        0.7 if warning_patterns else 0.8
-            comparison_summary = f"Standalone analysis: Found {len(test_patterns)} patterns ({len(critical_patterns)} critical, {len(warning_patterns)} warnings). No baseline comparison available."
+        try:
+            test_file_size = len(test_content)
+            
+            baseline_key = _resolve_baseline(baseline_log_path)
+            
+            # Re-analysis of identical content against the same baseline is
+            # answered from the cache; hashing is far cheaper than the scan
+            cache_key = (hashlib.sha256(test_content).hexdigest(), baseline_key)
+            cached = _cache_get(cache_key)
+            if cached is not None:
+                return _restore_result(cached)
+            
+            # Extract patterns from test file
+            test_patterns = _log_processor.extract_patterns(test_content)
+        finally:
+            test_content.close()
         
-        # Build result
-        result = LogAnalysisResult(
-            status=status,
-            confidence=confidence,
-            failure_indicators=[p.description for p in critical_patterns],
-            comparison_summary=comparison_summary,
-            recommendations=recommendations,
-            processing_stats={
-                'test_file_size': len(test_content),
-                'baseline_file_size': len(baseline_content) if baseline_content else 0,
-                'patterns_detected': len(test_patterns),
-                'critical_patterns': len(critical_patterns),
-                'warning_patterns': len(warning_patterns),
-                'has_baseline': has_baseline,
-                'comparison_result': comparison
-            }
-        )
+        # The same gold standard is typically compared against many
+        # test files, so its patterns are cached per file version
+        baseline_patterns = _baseline_patterns_cached(*baseline_key) if baseline_key is not None else ()
+        result = _build_analysis_result(test_patterns, test_file_size, baseline_key, baseline_patterns)
         
-        return asdict(result)
+        _cache_put(cache_key, _snapshot_result(result))
+        return result.to_dict()
         
     except Exception as e:
         logger.error(f"Error in analyze_logs: {str(e)}")
@@ -383,13 +750,49 @@ def analyze_multiple_logs(
         total_critical = 0
         total_warnings = 0
         
-        # Process each file
-        for i, log_path in enumerate(log_file_paths):
-            logger.info(f"Processing file {i+1}/{len(log_file_paths)}: {log_path}")
-            
-            # Analyze individual file
-            result = analyze_logs(log_path, baseline_log_path, analysis_type)
-            
+        # Extract the gold standard once here; workers are handed its patterns
+        # rather than each rescanning it
+        baseline_key = _resolve_baseline(baseline_log_path)
+        baseline_patterns = _baseline_patterns_cached(*baseline_key) if baseline_key is not None else ()
+        
+        # Files already analyzed against this baseline are answered from the
+        # cache; only the rest are analyzed
+        results: List[Optional[Dict[str, Any]]] = [None] * len(log_file_paths)
+        pending = []
+        pending_bytes = 0
+        for index, log_path in enumerate(log_file_paths):
+            test_valid, test_msg, test_content = _log_processor.validate_and_open(log_path)
+            if not test_valid:
+                results[index] = {"error": f"Test log validation failed: {test_msg}"}
+                continue
+            try:
+                cache_key = (hashlib.sha256(test_content).hexdigest(), baseline_key)
+                pending_bytes += len(test_content)
+            finally:
+                test_content.close()
+            cached = _cache_get(cache_key)
+            if cached is not None:
+                results[index] = _restore_result(cached)
+            else:
+                pending.append((index, log_path, cache_key))
+        
+        # Files are independent, so large batches are analyzed in worker
+        # processes to use every core rather than one interpreter
+        pending_paths = [log_path for _, log_path, _ in pending]
+        if _use_pool(len(pending), pending_bytes):
+            outcomes = _pool_map(_analyze_uncached, pending_paths, repeat(baseline_key), repeat(baseline_patterns))
+        else:
+            outcomes = [_analyze_uncached(log_path, baseline_key, baseline_patterns) for log_path in pending_paths]
+        
+        # Results are cached here in the parent, where later calls look for them
+        for (index, _, cache_key), outcome in zip(pending, outcomes):
+            if isinstance(outcome, bytes):
+                _cache_put(cache_key, outcome)
+                outcome = _restore_result(outcome)
+            results[index] = outcome
+        
+        # Collect each file's result
+        for log_path, result in zip(log_file_paths, results):
             if "error" not in result:
                 all_results.append({
                     'file_path': log_path,
@@ -446,6 +849,10 @@ def analyze_multiple_logs(
         return {"error": f"Batch analysis failed: {str(e)}"}
 
 
+# File extensions picked up from the upload directory
+_UPLOAD_EXTENSIONS = frozenset({'.log', '.txt', '.csv'})
+
+
 @tool(
     name="scan_for_uploaded_files",
     description="MANDATORY FIRST STEP: Always use this tool first to scan temp_uploads directory for available log files before any analysis"
@@ -458,22 +865,24 @@ def scan_for_uploaded_files() -> Dict[str, Any]:
         Dictionary containing information about available files for analysis
     """
     try:
-        from pathlib import Path
-        import os
+        temp_dir = "temp_uploads"
         
-        temp_dir = Path("temp_uploads")
-        
-        if not temp_dir.exists():
+        if not os.path.isdir(temp_dir):
             return {
                 "files_found": 0,
                 "message": "No temp_uploads directory found. Please upload log files first.",
                 "files": []
             }
         
-        # Find log files
-        log_files = []
-        for pattern in ["*.log", "*.txt", "*.csv"]:
-            log_files.extend(temp_dir.glob(pattern))
+        # Find log files in a single directory pass, filtering by extension
+        # (hidden files are skipped, as glob did)
+        with os.scandir(temp_dir) as entries:
+            log_files = [
+                entry for entry in entries
+                if not entry.name.startswith('.')
+                and os.path.splitext(entry.name)[1].lower() in _UPLOAD_EXTENSIONS
+                and entry.is_file()
+            ]
         
         if not log_files:
             return {
@@ -484,18 +893,18 @@ def scan_for_uploaded_files() -> Dict[str, Any]:
         
         # Process file information
         file_info = []
-        for file_path in log_files:
+        for entry in log_files:
             try:
-                file_size = file_path.stat().st_size
+                file_size = entry.stat().st_size
                 file_info.append({
-                    "name": file_path.name,
-                    "path": str(file_path),
+                    "name": entry.name,
+                    "path": entry.path,
                     "size_bytes": file_size,
                     "size_mb": round(file_size / (1024 * 1024), 2),
-                    "type": "error_log" if "error" in file_path.name.lower() else "log"
+                    "type": "error_log" if "error" in entry.name.lower() else "log"
                 })
             except Exception as e:
-                logger.warning(f"Could not process file {file_path}: {e}")
+                logger.warning(f"Could not process file {entry.path}: {e}")
         
         # Sort by size (largest first) and limit to most recent 10
         file_info.sort(key=lambda x: x["size_bytes"], reverse=True)
@@ -513,6 +922,24 @@ def scan_for_uploaded_files() -> Dict[str, Any]:
         return {"error": f"File scan failed: {str(e)}"}
 
 
+def _count_lines(buffer: Union[bytes, mmap.mmap], start: int, end: int,
+                 newline_offsets: Optional['np.ndarray'] = None) -> int:
+    """Count the lines in a line-aligned, non-empty range of buffer"""
+    if newline_offsets is not None:
+        newline_count = int(newline_offsets.searchsorted(end) - newline_offsets.searchsorted(start))
+    else:
+        newline_count = buffer[start:end].count(b'\n')
+    return newline_count + (buffer[end - 1] != 0x0A)
+
+
+def _scan_file_range(file_path: str, start: int, end: int) -> Tuple[List[FailurePattern], int]:
+    """Scan one chunk of a mapped log file in a worker process for
+    process_large_files, when the opt-in pool is enabled; returns the chunk's
+    patterns and line count"""
+    with _open_mapped(file_path) as (mapped, _):
+        return _log_processor.extract_patterns_range(mapped, start, end), _count_lines(mapped, start, end)
+
+
 @tool(
     name="process_large_files", 
     description="Process large log files (>50MB) using chunked processing for memory efficiency"
@@ -537,35 +964,59 @@ def process_large_files(
         # Update processor chunk size if specified
         processor = LogProcessor(chunk_size_mb=chunk_size_mb)
         
-        # Validate file
-        valid, msg = processor.validate_file(file_path)
+        # Validate file, keeping the mapping validation opened
+        valid, msg, mapped = processor.validate_and_open(file_path)
         if not valid:
             return {"error": f"File validation failed: {msg}"}
         
-        # Split into chunks
-        chunks = processor.chunk_file(file_path)
-        
         # Process each chunk
         all_patterns = []
         chunk_summaries = []
         total_lines = 0
+        file_size = len(mapped)
         
-        for chunk in chunks:
-            # Extract patterns from chunk
-            patterns = processor.extract_patterns(chunk.content)
+        try:
+            # Chunks are line-aligned ranges of the mapping, scanned in place
+            # rather than copied out
+            chunk_ranges = []
+            start = 0
+            while start < file_size:
+                end = _line_aligned_end(mapped, b'\n', start, processor.chunk_size_bytes)
+                chunk_ranges.append((start, end))
+                start = end
+            
+            if _use_pool(len(chunk_ranges), file_size):
+                # Only when LOG_ANALYSIS_WORKERS enables the pool: re holds the
+                # GIL while matching, so threads would not scan in parallel;
+                # chunks go to worker processes, each mapping the file itself
+                # since a mapping cannot be pickled
+                chunk_results = _pool_map(_scan_file_range, repeat(file_path), *zip(*chunk_ranges))
+            else:
+                # Index every newline once; each chunk's scan and line range
+                # reuse slices of the index instead of rescanning the chunk
+                newline_offsets = _newline_offsets(mapped) if np is not None else None
+                chunk_results = [
+                    (processor.extract_patterns_range(mapped, start, end, newline_offsets),
+                     _count_lines(mapped, start, end, newline_offsets))
+                    for start, end in chunk_ranges
+                ]
+        finally:
+            mapped.close()
+        
+        for (start, end), (patterns, line_count) in zip(chunk_ranges, chunk_results):
             all_patterns.extend(patterns)
             
             # Create chunk summary
             chunk_summary = {
-                'chunk_id': chunk.chunk_id,
-                'lines': f"{chunk.start_line}-{chunk.end_line}",
-                'size_mb': chunk.size_bytes / (1024 * 1024),
+                'chunk_id': len(chunk_summaries),
+                'lines': f"{total_lines + 1}-{total_lines + line_count}",
+                'size_mb': (end - start) / (1024 * 1024),
                 'patterns_found': len(patterns),
                 'critical_patterns': len([p for p in patterns if p.severity == 'CRITICAL']),
                 'warning_patterns': len([p for p in patterns if p.severity == 'WARNING'])
             }
             chunk_summaries.append(chunk_summary)
-            total_lines = max(total_lines, chunk.end_line)
+            total_lines += line_count
         
         # Aggregate results
         critical_patterns = [p for p in all_patterns if p.severity == 'CRITICAL']
@@ -590,9 +1041,9 @@ def process_large_files(
             'confidence': confidence,
             'file_info': {
                 'path': file_path,
-                'total_chunks': len(chunks),
+                'total_chunks': len(chunk_summaries),
                 'total_lines': total_lines,
-                'file_size_mb': os.path.getsize(file_path) / (1024 * 1024)
+                'file_size_mb': file_size / (1024 * 1024)
             },
             'analysis_summary': {
                 'total_patterns': len(all_patterns),
@@ -650,7 +1101,8 @@ def analyze_log_content(
         # If baseline provided, do comparison
         comparison = None
         if baseline_log_content and baseline_log_content.strip():
-            comparison = _log_processor.compare_with_baseline(test_log_content, baseline_log_content)
+            baseline_patterns = _log_processor.extract_patterns(baseline_log_content)
+            comparison = _log_processor.compare_patterns(test_patterns, baseline_patterns)
         
         # Generate recommendations based on findings
         recommendations = []
@@ -695,13 +1147,111 @@ def analyze_log_content(
             }
         )
         
-        return asdict(result)
+        return result.to_dict()
         
     except Exception as e:
         logger.error(f"Error in analyze_log_content: {str(e)}")
         return {"error": f"Content analysis failed: {str(e)}"}
 
 
+# Category bucket per (pattern type, severity); connection and service failures split on severity
+_PATTERN_SEVERITIES = ('CRITICAL', 'WARNING', 'INFO')
+_DISPATCH = {
+    **{
+        (pattern_type, severity): 'critical_failures' if severity == 'CRITICAL' else 'connection_problems'
+        for pattern_type in ('connection_timeout', 'service_failures')
+        for severity in _PATTERN_SEVERITIES
+    },
+    **{
+        (pattern_type, severity): bucket
+        for pattern_type, bucket in (
+            ('memory_issues', 'resource_issues'),
+            ('disk_issues', 'resource_issues'),
+            ('performance_degradation', 'performance_issues')
+        )
+        for severity in _PATTERN_SEVERITIES
+    }
+}
+
+# Output order of the indicator categories
+_BUCKET_ORDER = ('critical_failures', 'performance_issues', 'connection_problems', 'resource_issues', 'other_warnings')
+
+# Pattern severity required by each extract_failure_indicators severity_filter value
+_SEVERITY_FILTERS = {'critical': 'CRITICAL', 'warning': 'WARNING'}
+
+# Risk level indexed by how many of the 30/70 risk score thresholds are exceeded
+_RISK_LEVELS = ('LOW', 'MEDIUM', 'HIGH')
+
+
+def _indicator_entry(pattern: FailurePattern) -> Dict[str, Any]:
+    """Summarize one pattern for the categorized indicator output"""
+    return {
+        'type': pattern.pattern_type,
+        'severity': pattern.severity,
+        'description': pattern.description,
+        'confidence': pattern.confidence,
+        'matches': pattern.match_count,
+        'sample_lines': pattern.matched_lines[:5]  # First 5 matches
+    }
+
+
+def _categorize_indicators(
+    log_content: str,
+    indicator_types: Optional[List[str]],
+    severity_filter: str
+) -> Tuple[Dict[str, Any], Dict[str, List[FailurePattern]], List[str]]:
+    """Filter and bucket the patterns found in log content; returns the summary,
+    the non-empty categories in output order, and the recommendations"""
+    # Extract all patterns
+    patterns = _log_processor.extract_patterns(log_content)
+    
+    # Severity a pattern must have to pass the filter (None keeps all)
+    required_severity = _SEVERITY_FILTERS.get(severity_filter.lower())
+    wanted_types = frozenset(indicator_types) if indicator_types else None
+    
+    # Filter, categorize and count in a single pass over the patterns
+    categorized = defaultdict(list)
+    severity_counts = Counter()
+    
+    for pattern in patterns:
+        pattern_type = pattern.pattern_type
+        severity = pattern.severity
+        if required_severity is not None and severity != required_severity:
+            continue
+        if wanted_types is not None and pattern_type not in wanted_types:
+            continue
+        
+        severity_counts[severity] += 1
+        categorized[_DISPATCH.get((pattern_type, severity), 'other_warnings')].append(pattern)
+    
+    # Only categories that received indicators exist; emit them in output order
+    categorized_indicators = {
+        category: categorized[category]
+        for category in _BUCKET_ORDER
+        if category in categorized
+    }
+    category_mask = 0
+    for category in categorized_indicators:
+        category_mask |= _CATEGORY_BITS.get(category, 0)
+    
+    # Generate summary statistics
+    total_indicators = sum(severity_counts.values())
+    critical_count = severity_counts['CRITICAL']
+    warning_count = severity_counts['WARNING']
+    
+    # Calculate risk score (0-100)
+    risk_score = min(100, (critical_count * 30) + (warning_count * 10))
+    
+    summary = {
+        'total_indicators': total_indicators,
+        'critical_count': critical_count,
+        'warning_count': warning_count,
+        'risk_score': risk_score,
+        'risk_level': _RISK_LEVELS[(risk_score > 30) + (risk_score > 70)]
+    }
+    return summary, categorized_indicators, _generate_indicator_recommendations(category_mask, risk_score)
+
+
 @tool(
     name="extract_failure_indicators",
     description="Extract and categorize specific failure patterns and indicators from log content"
@@ -726,105 +1276,97 @@ def extract_failure_indicators(
         if not log_content or not log_content.strip():
             return {"error": "Empty or invalid log content provided"}
         
-        # Extract all patterns
-        patterns = _log_processor.extract_patterns(log_content)
-        
-        # Filter by indicator types if specified
-        if indicator_types:
-            patterns = [p for p in patterns if p.pattern_type in indicator_types]
-        
-        # Filter by severity
-        if severity_filter.lower() == "critical":
-            patterns = [p for p in patterns if p.severity == "CRITICAL"]
-        elif severity_filter.lower() == "warning":
-            patterns = [p for p in patterns if p.severity == "WARNING"]
-        
-        # Categorize patterns
-        categorized = {
-            'critical_failures': [],
-            'performance_issues': [],
-            'connection_problems': [],
-            'resource_issues': [],
-            'other_warnings': []
-        }
-        
-        for pattern in patterns:
-            if pattern.pattern_type in ['connection_timeout', 'service_failures']:
-                if pattern.severity == 'CRITICAL':
-                    categorized['critical_failures'].append(pattern)
-                else:
-                    categorized['connection_problems'].append(pattern)
-            elif pattern.pattern_type in ['memory_issues', 'disk_issues']:
-                categorized['resource_issues'].append(pattern)
-            elif pattern.pattern_type == 'performance_degradation':
-                categorized['performance_issues'].append(pattern)
-            else:
-                categorized['other_warnings'].append(pattern)
+        summary, categorized, recommendations = _categorize_indicators(log_content, indicator_types, severity_filter)
         
-        # Generate summary statistics
-        total_indicators = len(patterns)
-        critical_count = len([p for p in patterns if p.severity == 'CRITICAL'])
-        warning_count = len([p for p in patterns if p.severity == 'WARNING'])
-        
-        # Calculate risk score (0-100)
-        risk_score = min(100, (critical_count * 30) + (warning_count * 10))
-        
-        result = {
-            'summary': {
-                'total_indicators': total_indicators,
-                'critical_count': critical_count,
-                'warning_count': warning_count,
-                'risk_score': risk_score,
-                'risk_level': 'HIGH' if risk_score > 70 else 'MEDIUM' if risk_score > 30 else 'LOW'
-            },
+        return {
+            'summary': summary,
             'categorized_indicators': {
-                category: [
-                    {
-                        'type': p.pattern_type,
-                        'severity': p.severity,
-                        'description': p.description,
-                        'confidence': p.confidence,
-                        'matches': len(p.matched_lines),
-                        'sample_lines': p.matched_lines[:5]  # First 5 matches
-                    }
-                    for p in indicators
-                ]
+                category: [_indicator_entry(p) for p in indicators]
                 for category, indicators in categorized.items()
-                if indicators  # Only include categories with indicators
             },
-            'recommendations': _generate_indicator_recommendations(categorized, risk_score)
+            'recommendations': recommendations
         }
         
-        return result
-        
     except Exception as e:
         logger.error(f"Error in extract_failure_indicators: {str(e)}")
         return {"error": f"Failure indicator extraction failed: {str(e)}"}
 
 
-def _generate_indicator_recommendations(categorized: Dict, risk_score: int) -> List[str]:
-    """Generate recommendations based on categorized indicators"""
-    recommendations = []
-    
-    if categorized['critical_failures']:
-        recommendations.append("URGENT: Critical system failures detected - immediate investigation required")
-    
-    if categorized['connection_problems']:
-        recommendations.append("Check network connectivity and USB/serial connections")
+def _dumps(obj: Any) -> bytes:
+    """Encode a value as compact JSON bytes, with orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+
+def extract_failure_indicators_stream(
+    log_content: str,
+    indicator_types: List[str] = None,
+    severity_filter: str = "all"
+) -> Iterator[bytes]:
+    """
+    Stream the extract_failure_indicators result as JSON fragments.
     
-    if categorized['resource_issues']:
-        recommendations.append("Monitor system resources - memory and disk space may be insufficient")
+    Each indicator entry is encoded as soon as it is built, so the full nested
+    result dict never exists in memory. Joining the fragments gives one JSON
+    document with the same content as extract_failure_indicators returns.
     
-    if categorized['performance_issues']:
-        recommendations.append("Performance degradation detected - consider system optimization")
+    Args:
+        log_content: Raw log content to analyze
+        indicator_types: List of specific indicator types to look for (optional)
+        severity_filter: Filter by severity ("all", "critical", "warning")
     
-    if risk_score > 70:
-        recommendations.append("HIGH RISK: Multiple critical issues - system may be unreliable")
-    elif risk_score > 30:
-        recommendations.append("MEDIUM RISK: Several issues detected - preventive maintenance recommended")
-    else:
-        recommendations.append("LOW RISK: Minor issues detected - monitor for trends")
+    Yields:
+        UTF-8 encoded JSON fragments
+    """
+    try:
+        if not log_content or not log_content.strip():
+            yield _dumps({"error": "Empty or invalid log content provided"})
+            return
+        
+        summary, categorized, recommendations = _categorize_indicators(log_content, indicator_types, severity_filter)
+    except Exception as e:
+        logger.error(f"Error in extract_failure_indicators_stream: {str(e)}")
+        yield _dumps({"error": f"Failure indicator extraction failed: {str(e)}"})
+        return
     
+    yield b'{"summary":' + _dumps(summary) + b',"categorized_indicators":{'
+    for category_index, (category, indicators) in enumerate(categorized.items()):
+        yield (b',' if category_index else b'') + _dumps(category) + b':['
+        for index, pattern in enumerate(indicators):
+            yield (b',' if index else b'') + _dumps(_indicator_entry(pattern))
+        yield b']'
+    yield b'},"recommendations":' + _dumps(recommendations) + b'}'
+
+
+# Bit set in the category mask for each indicator category that has a recommendation
+_CATEGORY_BITS = {
+    'critical_failures': 1,
+    'connection_problems': 2,
+    'resource_issues': 4,
+    'performance_issues': 8
+}
+
+# Recommendation emitted for each category bit present in the mask, in output order
+_REC_TABLE = (
+    (1, "URGENT: Critical system failures detected - immediate investigation required"),
+    (2, "Check network connectivity and USB/serial connections"),
+    (4, "Monitor system resources - memory and disk space may be insufficient"),
+    (8, "Performance degradation detected - consider system optimization")
+)
+
+# Closing recommendation per risk level, indexed like _RISK_LEVELS
+_RISK_RECS = (
+    "LOW RISK: Minor issues detected - monitor for trends",
+    "MEDIUM RISK: Several issues detected - preventive maintenance recommended",
+    "HIGH RISK: Multiple critical issues - system may be unreliable"
+)
+
+
+def _generate_indicator_recommendations(category_mask: int, risk_score: int) -> List[str]:
+    """Generate recommendations from the mask of non-empty indicator categories"""
+    recommendations = [message for bit, message in _REC_TABLE if category_mask & bit]
+    recommendations.append(_RISK_RECS[(risk_score > 30) + (risk_score > 70)])
     return recommendations
 
 
@@ -76,22 +76,29 @@ class MultiModalProcessor:
         
         # Visual element detection patterns
         self.visual_patterns = {
-            'diagram_references': r'(?i)(?:see\s+)?(?:diagram|figure|image|chart)\s*[:\-]?\s*([^.\n]+)',
-            'step_references': r'(?i)(?:step\s+\d+|procedure\s+\d+|figure\s+\d+)',
-            'visual_indicators': r'(?i)(?:shown\s+(?:in|below)|illustrated|depicted|see\s+(?:above|below))',
-            'location_references': r'(?i)(?:front|back|left|right|top|bottom|side)\s+(?:panel|cover|access)'
+            'diagram_references': re.compile(r'(?:see\s+)?(?:diagram|figure|image|chart)\s*[:\-]?\s*([^.\n]+)', re.IGNORECASE),
+            'step_references': re.compile(r'(?:step\s+\d+|procedure\s+\d+|figure\s+\d+)', re.IGNORECASE),
+            'visual_indicators': re.compile(r'(?:shown\s+(?:in|below)|illustrated|depicted|see\s+(?:above|below))', re.IGNORECASE),
+            'location_references': re.compile(r'(?:front|back|left|right|top|bottom|side)\s+(?:panel|cover|access)', re.IGNORECASE)
         }
         
         # Content structure patterns
+        structure_flags = re.IGNORECASE | re.MULTILINE | re.DOTALL
         self.structure_patterns = {
-            'symptoms': r'(?i)symptom[s]?:\s*([^#\n]+)',
-            'indicators': r'(?i)indicator[s]?\s+in\s+logs?:\s*(.*?)(?=\*\*|$)',
-            'troubleshooting_steps': r'(?i)\*\*troubleshooting\s+steps?\*\*:\s*(.*?)(?=\*\*|$)',
-            'expected_results': r'(?i)\*\*expected\s+results?\*\*:\s*(.*?)(?=\*\*|$|##)',
-            'safety_notes': r'(?i)\*\*safety\s+notes?\*\*:\s*(.*?)(?=\*\*|$|##)',
-            'when_to_contact': r'(?i)(?:when\s+to\s+contact|escalate).*?:\s*(.*?)(?=##|$)'
+            'symptoms': re.compile(r'symptom[s]?:\s*([^#\n]+)', structure_flags),
+            'indicators': re.compile(r'indicator[s]?\s+in\s+logs?:\s*(.*?)(?=\*\*|$)', structure_flags),
+            'troubleshooting_steps': re.compile(r'\*\*troubleshooting\s+steps?\*\*:\s*(.*?)(?=\*\*|$)', structure_flags),
+            'expected_results': re.compile(r'\*\*expected\s+results?\*\*:\s*(.*?)(?=\*\*|$|##)', structure_flags),
+            'safety_notes': re.compile(r'\*\*safety\s+notes?\*\*:\s*(.*?)(?=\*\*|$|##)', structure_flags),
+            'when_to_contact': re.compile(r'(?:when\s+to\s+contact|escalate).*?:\s*(.*?)(?=##|$)', structure_flags)
         }
         
+        # Numbered "N. **Title** description" procedure steps
+        self.procedure_pattern = re.compile(r'(?:^|\n)\s*(\d+)\.\s*\*\*([^*]+)\*\*\s*(.*?)(?=\n\s*\d+\.|$)', structure_flags)
+        
+        # Fenced code blocks that may hold ASCII diagrams
+        self.code_block_pattern = re.compile(r'```(.*?)```', re.DOTALL)
+        
         # Guidance generation templates
         self.guidance_templates = {
             'diagnostic_step': {
@@ -114,7 +121,7 @@ class MultiModalProcessor:
         
         # Extract structured sections using patterns
         for section_type, pattern in self.structure_patterns.items():
-            matches = re.findall(pattern, content, re.MULTILINE | re.DOTALL)
+            matches = pattern.findall(content)
             if matches:
                 sections[section_type] = [match.strip() for match in matches]
         
@@ -151,8 +158,7 @@ class MultiModalProcessor:
         procedures = []
         
         # Find numbered lists and procedures
-        procedure_pattern = r'(?i)(?:^|\n)\s*(\d+)\.\s*\*\*([^*]+)\*\*\s*(.*?)(?=\n\s*\d+\.|$)'
-        matches = re.findall(procedure_pattern, content, re.MULTILINE | re.DOTALL)
+        matches = self.procedure_pattern.findall(content)
         
         for match in matches:
             step_num, title, description = match
@@ -170,7 +176,7 @@ class MultiModalProcessor:
         references = []
         
         for pattern in self.visual_patterns.values():
-            matches = re.findall(pattern, text)
+            matches = pattern.findall(text)
             references.extend(matches)
         
         return list(set(references))  # Remove duplicates
@@ -195,7 +201,7 @@ class MultiModalProcessor:
         elements = []
         
         # Find diagram references
-        diagram_matches = re.finditer(self.visual_patterns['diagram_references'], content)
+        diagram_matches = self.visual_patterns['diagram_references'].finditer(content)
         for i, match in enumerate(diagram_matches):
             description = match.group(1).strip()
             elements.append(VisualElement(
@@ -233,8 +239,7 @@ class MultiModalProcessor:
         elements = []
         
         # Look for code blocks that might contain diagrams
-        code_block_pattern = r'```(.*?)```'
-        matches = re.finditer(code_block_pattern, content, re.DOTALL)
+        matches = self.code_block_pattern.finditer(content)
         
         for i, match in enumerate(matches):
             block_content = match.group(1).strip()
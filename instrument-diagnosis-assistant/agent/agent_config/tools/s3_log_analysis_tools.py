@@ -8,7 +8,7 @@ to handle large files efficiently without loading entire files into memory.
 import re
 import json
 from typing import Dict, List, Any, Optional, Tuple
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 import logging
 from strands import tool
 from .s3_storage_tools import get_storage_manager
@@ -30,6 +30,21 @@ class LogSummary:
     warning_patterns: List[str]
     timestamp_range: Optional[Tuple[str, str]]
     summary_length: int
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Build a shallow dict of the fields; nested values are already JSON-safe"""
+        return {
+            's3_uri': self.s3_uri,
+            'file_name': self.file_name,
+            'total_lines': self.total_lines,
+            'error_count': self.error_count,
+            'warning_count': self.warning_count,
+            'critical_events': self.critical_events,
+            'error_patterns': self.error_patterns,
+            'warning_patterns': self.warning_patterns,
+            'timestamp_range': self.timestamp_range,
+            'summary_length': self.summary_length
+        }
 
 
 class S3LogAnalyzer:
@@ -61,9 +76,9 @@ class S3LogAnalyzer:
         warning_lines = []
         critical_events = []
         
-        error_pattern = re.compile(r'(?i)(error|fail|exception|critical)', re.IGNORECASE)
-        warning_pattern = re.compile(r'(?i)(warning|warn|caution)', re.IGNORECASE)
-        critical_pattern = re.compile(r'(?i)(critical|fatal|severe|emergency)', re.IGNORECASE)
+        error_pattern = re.compile(r'(?:error|fail|exception|critical)', re.IGNORECASE)
+        warning_pattern = re.compile(r'(?:warning|warn|caution)', re.IGNORECASE)
+        critical_pattern = re.compile(r'(?:critical|fatal|severe|emergency)', re.IGNORECASE)
         
         for i, line in enumerate(lines):
             if critical_pattern.search(line):
@@ -145,26 +160,31 @@ class S3LogAnalyzer:
             summary.s3_uri = f"s3://{storage_manager.bucket_name}/{s3_key}"
             summary.file_name = s3_key.split('/')[-1]
             
-            # Categorize patterns
-            critical_patterns = [p for p in patterns if p.severity == 'CRITICAL']
-            warning_patterns = [p for p in patterns if p.severity == 'WARNING']
+            # Count critical and warning patterns in a single pass
+            critical_count = 0
+            warning_count = 0
+            for p in patterns:
+                if p.severity == 'CRITICAL':
+                    critical_count += 1
+                elif p.severity == 'WARNING':
+                    warning_count += 1
             
             return {
                 'success': True,
                 's3_key': s3_key,
                 's3_uri': summary.s3_uri,
-                'summary': asdict(summary),
+                'summary': summary.to_dict(),
                 'patterns': {
                     'total': len(patterns),
-                    'critical': len(critical_patterns),
-                    'warnings': len(warning_patterns),
+                    'critical': critical_count,
+                    'warnings': warning_count,
                     'details': [
                         {
                             'type': p.pattern_type,
                             'severity': p.severity,
                             'description': p.description,
                             'confidence': p.confidence,
-                            'matches': len(p.matched_lines),
+                            'matches': p.match_count,
                             'sample_lines': p.matched_lines[:3]
                         }
                         for p in patterns[:10]  # Limit to top 10 patterns
@@ -198,8 +218,8 @@ class S3LogAnalyzer:
             test_patterns = self.log_processor.extract_patterns(test_content)
             baseline_patterns = self.log_processor.extract_patterns(baseline_content)
             
-            # Compare patterns
-            comparison = self.log_processor.compare_with_baseline(test_content, baseline_content)
+            # Compare the extracted patterns without rescanning both files
+            comparison = self.log_processor.compare_patterns(test_patterns, baseline_patterns)
             
             # Extract summaries
             test_summary = self.extract_summary(test_content)
@@ -209,12 +229,12 @@ class S3LogAnalyzer:
                 'success': True,
                 'test_file': {
                     's3_key': test_s3_key,
-                    'summary': asdict(test_summary),
+                    'summary': test_summary.to_dict(),
                     'patterns': len(test_patterns)
                 },
                 'baseline_file': {
                     's3_key': baseline_s3_key,
-                    'summary': asdict(baseline_summary),
+                    'summary': baseline_summary.to_dict(),
                     'patterns': len(baseline_patterns)
                 },
                 'comparison': comparison,
@@ -358,7 +378,7 @@ def extract_s3_log_summary(
         summary.s3_uri = f"s3://{storage_manager.bucket_name}/{s3_key}"
         summary.file_name = s3_key.split('/')[-1]
         
-        result = asdict(summary)
+        result = summary.to_dict()
         result['success'] = True
         
         # Add quick assessment
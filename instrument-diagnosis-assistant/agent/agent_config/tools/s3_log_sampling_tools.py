@@ -13,6 +13,11 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Line classifiers for get_log_statistics (case-insensitive at compile time)
+_ERROR_LINE_PATTERN = re.compile(r'(?:error|fail|exception)', re.IGNORECASE)
+_WARNING_LINE_PATTERN = re.compile(r'(?:warning|warn)', re.IGNORECASE)
+_CRITICAL_LINE_PATTERN = re.compile(r'(?:critical|fatal|severe)', re.IGNORECASE)
+
 
 @tool(
     name="search_log_for_pattern",
@@ -243,9 +248,9 @@ def get_log_statistics(
         lines = content.split('\n')
         
         # Count patterns
-        error_count = sum(1 for line in lines if re.search(r'(?i)(error|fail|exception)', line))
-        warning_count = sum(1 for line in lines if re.search(r'(?i)(warning|warn)', line))
-        critical_count = sum(1 for line in lines if re.search(r'(?i)(critical|fatal|severe)', line))
+        error_count = sum(1 for line in lines if _ERROR_LINE_PATTERN.search(line))
+        warning_count = sum(1 for line in lines if _WARNING_LINE_PATTERN.search(line))
+        critical_count = sum(1 for line in lines if _CRITICAL_LINE_PATTERN.search(line))
         
         # Find timestamp range
         timestamp_pattern = re.compile(r'\d{4}-\d{2}-\d{2}[T\s]\d{2}:\d{2}:\d{2}')
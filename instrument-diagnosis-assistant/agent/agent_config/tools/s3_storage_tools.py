@@ -8,6 +8,7 @@ session-based organization, presigned URLs, and metadata tracking.
 import os
 import boto3
 import json
+import threading
 import hashlib
 from typing import Dict, List, Any, Optional
 from dataclasses import dataclass, asdict
@@ -327,15 +328,19 @@ class S3StorageManager:
         return content_types.get(ext, 'application/octet-stream')
 
 
-# Global storage manager instance
-_storage_manager = None
+# Global storage manager instance, built once under the lock so concurrent
+# first calls from the agent's threads share a single instance
+_storage_manager: Optional[S3StorageManager] = None
+_storage_manager_lock = threading.Lock()
 
 
 def get_storage_manager() -> S3StorageManager:
     """Get or create global storage manager instance"""
     global _storage_manager
     if _storage_manager is None:
-        _storage_manager = S3StorageManager()
+        with _storage_manager_lock:
+            if _storage_manager is None:
+                _storage_manager = S3StorageManager()
     return _storage_manager
 
 